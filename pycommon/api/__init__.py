@@ -30,7 +30,12 @@ from .data_sources import (
     translate_user_data_sources_to_hash_data_sources,
 )
 from .embeddings import check_embedding_completion, delete_embeddings
-from .files import get_file_presigned_url, upload_file, upload_to_presigned_url
+from .files import (
+    get_file_presigned_url,
+    upload_file,
+    upload_files,
+    upload_to_presigned_url,
+)
 from .object_permissions import (
     can_access_objects,
     simulate_can_access_objects,
@@ -72,6 +77,7 @@ __all__ = [
     "delete_secret_parameter",
     "get_file_presigned_url",
     "upload_to_presigned_url",
+    "upload_files",
     "delete_assistant",
     "share_assistant",
     "get_json_credentials",
@@ -0,0 +1,230 @@
+# Copyright (c) 2024 Vanderbilt University
+# Authors: Jules White, Allen Karns, Karely Rodriguez, Max Moundas
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import dumps as _dumps
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    import json
+    from json import loads as _loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+# (connect, read) timeout in seconds for calls made through a pooled session
+DEFAULT_TIMEOUT = (3, 10)
+
+# Worker threads shared by the helpers that fan requests out concurrently
+_EXECUTOR_WORKERS = 8
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def api_base_url() -> str:
+    """Return API_BASE_URL, read from the environment once per process.
+
+    Raises:
+        KeyError: If API_BASE_URL is not set.
+    """
+    return os.environ["API_BASE_URL"]
+
+
+@lru_cache(maxsize=None)
+def env_setting(name: str) -> Optional[str]:
+    """Return the environment variable ``name``, read once per process.
+
+    For settings such as table names and OAuth endpoints that are fixed for
+    the life of a Lambda container. Unset variables are cached as None.
+    """
+    return os.getenv(name)
+
+
+def reload_config():
+    """Forget cached environment settings so the next call re-reads them."""
+    api_base_url.cache_clear()
+    env_setting.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def auth_headers(access_token: str) -> Mapping[str, str]:
+    """Return the JSON + bearer auth headers for a token.
+
+    The mapping is cached per token and read-only, so it can be shared by
+    every request made with that token.
+
+    Args:
+        access_token (str): Bearer token for API authentication.
+
+    Returns:
+        Mapping[str, str]: Content-Type and Authorization headers.
+    """
+    return MappingProxyType(
+        {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        }
+    )
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by concurrent API helpers.
+
+    The pool is created on first use so importing the package does not start
+    any threads.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_EXECUTOR_WORKERS, thread_name_prefix="pycommon-api"
+            )
+        return _executor
+
+
+def create_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 50,
+    retries: int = 3,
+    backoff_factor: float = 0.1,
+    retry_methods: Optional[Iterable[str]] = None,
+) -> requests.Session:
+    """Create a requests session that keeps connections to the API alive.
+
+    Reusing one session per module lets repeated calls to the same
+    API_BASE_URL share pooled sockets instead of opening a new TCP and TLS
+    connection for every request.
+
+    Args:
+        pool_connections (int): Number of host pools to cache.
+        pool_maxsize (int): Maximum number of connections kept per host.
+        retries (int): Retries for connection errors and 502/503/504
+            responses.
+        backoff_factor (float): Exponential backoff factor between retries.
+        retry_methods (Iterable[str], optional): HTTP methods that may be
+            retried. Defaults to urllib3's idempotent methods, which excludes
+            POST.
+
+    Returns:
+        requests.Session: A session with the pooled adapter mounted for
+            both http and https.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=(
+                Retry.DEFAULT_ALLOWED_METHODS
+                if retry_methods is None
+                else frozenset(retry_methods)
+            ),
+        ),
+    )
+    # API_BASE_URL is plain http for local stacks, so pool both schemes
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def warm_connection(session: requests.Session, url: Optional[str] = None):
+    """Open a pooled connection to the API ahead of the first real request.
+
+    Sends a HEAD request so the TCP and TLS handshakes happen now and the
+    connection is kept in the session's pool. Failures are ignored; the
+    first real request will simply connect as usual.
+
+    Args:
+        session (requests.Session): Session whose pool should be warmed.
+        url (str, optional): URL to connect to. Defaults to API_BASE_URL.
+    """
+    try:
+        session.head(url or api_base_url(), timeout=2)
+    except (requests.RequestException, KeyError):
+        pass
+
+
+def warm_on_import(session: requests.Session):
+    """Warm a module-level session when PYCOMMON_WARM_ON_IMPORT=1 is set."""
+    if os.environ.get("PYCOMMON_WARM_ON_IMPORT") == "1":
+        warm_connection(session)
+
+
+def parse_json(response: requests.Response):
+    """Decode a JSON response body, using orjson when it is installed.
+
+    Args:
+        response (requests.Response): Response whose body should be decoded.
+
+    Returns:
+        The decoded JSON document.
+
+    Raises:
+        ValueError: If the body is not valid JSON.
+    """
+    return _loads(response.content)
+
+
+def parse_json_object(response: requests.Response) -> Dict[str, Any]:
+    """Decode a response body that should be a JSON object.
+
+    Args:
+        response (requests.Response): Response whose body should be decoded.
+
+    Returns:
+        Dict[str, Any]: The decoded object.
+
+    Raises:
+        ValueError: If the body is not valid JSON or not a JSON object.
+    """
+    data = _loads(response.content)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize a request body to compact JSON bytes, preferring orjson."""
+    return _dumps(obj)
+
+
+def post_json(
+    session: requests.Session,
+    url: str,
+    payload: Any,
+    access_token: str,
+    timeout=DEFAULT_TIMEOUT,
+) -> requests.Response:
+    """POST a JSON payload with bearer auth through a pooled session.
+
+    The body is serialized once with dumps() and sent as raw bytes, with the
+    cached auth_headers() for the token.
+
+    Args:
+        session (requests.Session): Session to send the request with.
+        url (str): Endpoint URL.
+        payload (Any): JSON-serializable request body.
+        access_token (str): Bearer token for API authentication.
+        timeout: (connect, read) timeout passed to requests.
+
+    Returns:
+        requests.Response: The raw response.
+    """
+    return session.post(
+        url, headers=auth_headers(access_token), data=dumps(payload), timeout=timeout
+    )
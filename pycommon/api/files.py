@@ -1,8 +1,10 @@
 import os
-from typing import List, Union
+from concurrent.futures import Executor
+from typing import List, Optional, Union
 
 import requests
 
+from ._http import shared_executor
 from .data_sources import extract_key
 
 
@@ -83,6 +85,37 @@ def upload_file(
     return None
 
 
+def upload_files(
+    access_token: str,
+    files: List[dict],
+    executor: Optional[Executor] = None,
+) -> List[Optional[dict]]:
+    """Upload several files concurrently.
+
+    Each entry in ``files`` holds the keyword arguments accepted by
+    ``upload_file`` (``file_name``, ``file_contents``, ``file_type``, ``tags``
+    and the optional ``data_props``, ``enter_rag_pipeline`` and ``groupId``).
+    The uploads run on ``executor`` so that callers (and tests) can share a
+    single thread pool instead of spawning threads per batch.
+
+    Args:
+        access_token (str): Bearer token for API authentication.
+        files (List[dict]): Keyword arguments for each ``upload_file`` call.
+        executor (Executor, optional): Executor used to run the uploads.
+            Defaults to the package's shared thread pool.
+
+    Returns:
+        List[Optional[dict]]: The ``upload_file`` result for each entry, in
+            the same order as ``files``. Failed uploads are None.
+    """
+    if not files:
+        return []
+
+    pool = executor if executor is not None else shared_executor()
+    futures = [pool.submit(upload_file, access_token, **file) for file in files]
+    return [future.result() for future in futures]
+
+
 def get_file_presigned_url(access_token: str, payload: dict):
     """Obtain a presigned URL for file upload from the API.
 
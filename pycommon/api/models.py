@@ -1,43 +1,123 @@
-import os
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
 
 import requests
 
+from ._http import (
+    DEFAULT_TIMEOUT,
+    api_base_url,
+    auth_headers,
+    create_session,
+    parse_json_object,
+    warm_on_import,
+)
 
+logger = logging.getLogger(__name__)
+
+_SESSION = create_session()
+warm_on_import(_SESSION)
+
+
+def _ttl_cache(maxsize: int = 128, ttl: float = 300):
+    """Memoize a token-scoped API call for ``ttl`` seconds.
+
+    Entries are keyed on a hash of the access token plus the configured
+    API_BASE_URL, so tokens never share results and reconfiguring the process
+    for another API invalidates them. Empty (failed) results are not cached.
+    The least recently used entry is dropped once ``maxsize`` is exceeded.
+    """
+
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(access_token):
+            key = (
+                hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest(),
+                api_base_url(),
+            )
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and now - entry[0] < ttl:
+                    cache.move_to_end(key)
+                    return dict(entry[1])
+
+            result = func(access_token)
+            if result:
+                with lock:
+                    cache[key] = (now, dict(result))
+                    cache.move_to_end(key)
+                    if len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return result
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+def invalidate_default_models_cache():
+    """Drop every memoized get_default_models result."""
+    get_default_models.cache_clear()
+
+
+@_ttl_cache(maxsize=128, ttl=300)
 def get_default_models(access_token):
-    api_url = os.environ.get("API_BASE_URL") + "/default_models"
+    """Fetch the default model ids for the authenticated user.
+
+    Missing or empty cheapest/advanced models fall back to the user model, and
+    a missing agent model falls back to the cheapest model.
+
+    Args:
+        access_token: Bearer token for authentication
+
+    Returns:
+        dict: user_model, cheapest_model, agent_model and advanced_model ids,
+        or an empty dict if the lookup failed
+    """
+    api_url = f"{api_base_url()}/default_models"
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
+    headers = auth_headers(access_token)
 
     try:
-        response = requests.get(api_url, headers=headers)
+        response = _SESSION.get(api_url, headers=headers, timeout=DEFAULT_TIMEOUT)
         response.raise_for_status()  # Raise an exception for HTTP errors
 
-        data = response.json()
-        # print(f"Data: {data}")
+        data = parse_json_object(response)
+        models = data.get("data") if data.get("success") else None
 
-        if not data or not data.get("success") or not data.get("data"):
-            print("Missing data in default models response")
+        if not models or not isinstance(models, dict):
+            logger.warning("Missing data in default models response")
             return {}
 
-        data = data.get("data")
-        default_model_id = data.get("user")
+        get = models.get
+        user = get("user")
 
-        if not default_model_id:
-            print("Missing default model")
+        if not user:
+            logger.warning("Missing default model")
             return {}
 
-        cheapest_model_id = data.get("cheapest") or default_model_id
+        # Empty strings and None fall back the same way
+        cheapest = get("cheapest") or user
 
         return {
-            "user_model": default_model_id,
-            "cheapest_model": cheapest_model_id,
-            "agent_model": data.get("agent") or cheapest_model_id,
-            "advanced_model": data.get("advanced") or default_model_id,
+            "user_model": user,
+            "cheapest_model": cheapest,
+            "agent_model": get("agent") or cheapest,
+            "advanced_model": get("advanced") or user,
         }
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching default models: {str(e)}")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Error fetching default models: %s", e)
     return {}
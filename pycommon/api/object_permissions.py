@@ -1,12 +1,78 @@
 # Copyright (c) 2024 Vanderbilt University
 # Authors: Jules White, Allen Karns, Karely Rodriguez, Max Moundas
 
-import json
-import os
-from typing import Any, Dict, List, Optional
+import hashlib
+import threading
+import time
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 
+from ._http import (
+    api_base_url,
+    create_session,
+    parse_json_object,
+    post_json,
+    shared_executor,
+    warm_on_import,
+)
+
+# Maximum number of object ids sent in a single simulate_access_to_objects call
+SIMULATE_BATCH_SIZE = 100
+
+# Websites and sitemaps don't need permission checks
+_WEB_DATASOURCE_TYPES = frozenset({"website/url", "website/sitemap"})
+_WEB_URL_PREFIXES = ("http://", "https://")
+
+# Denied can_access_objects checks are remembered briefly so that repeated
+# checks for the same token and data sources don't hit the API again. Entries
+# are keyed on a digest of the token so no credentials are kept in memory.
+_DENY_TTL_SECONDS = 30
+_DENY_CACHE_MAX_ENTRIES = 1024
+_deny_cache: Dict[Tuple[str, str, Tuple[str, ...]], float] = {}
+_deny_cache_lock = threading.Lock()
+
+# Permission updates and checks are safe to repeat, so POSTs are retried too
+_SESSION = create_session(backoff_factor=0.2, retry_methods=("GET", "POST"))
+warm_on_import(_SESSION)
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Yield successive lists of at most ``size`` items."""
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _recently_denied(key: Tuple[str, str, Tuple[str, ...]]) -> bool:
+    """Return whether the access check for ``key`` was denied within the TTL."""
+    now = time.monotonic()
+    with _deny_cache_lock:
+        denied_at = _deny_cache.get(key)
+        if denied_at is None:
+            return False
+        if now - denied_at < _DENY_TTL_SECONDS:
+            return True
+        del _deny_cache[key]
+    return False
+
+
+def _remember_denied(key: Tuple[str, str, Tuple[str, ...]]):
+    """Record a denied access check, pruning expired entries first."""
+    now = time.monotonic()
+    with _deny_cache_lock:
+        for stale in [
+            k for k, t in _deny_cache.items() if now - t >= _DENY_TTL_SECONDS
+        ]:
+            del _deny_cache[stale]
+        if len(_deny_cache) >= _DENY_CACHE_MAX_ENTRIES:
+            _deny_cache.clear()
+        _deny_cache[key] = now
+
 
 def update_object_permissions(
     access_token: str,
@@ -32,9 +98,7 @@ def update_object_permissions(
     Returns:
         bool: True if permissions were updated successfully, False otherwise
     """
-    permissions_endpoint = (
-        os.environ["API_BASE_URL"] + "/utilities/update_object_permissions"
-    )
+    permissions_endpoint = f"{api_base_url()}/utilities/update_object_permissions"
 
     request = {
         "data": {
@@ -47,19 +111,11 @@ def update_object_permissions(
         }
     }
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
-
     try:
-        response = requests.post(
-            permissions_endpoint, headers=headers, data=json.dumps(request)
-        )
+        response = post_json(_SESSION, permissions_endpoint, request, access_token)
 
-        response_content = (
-            response.json()
-        )  # to adhere to object access return response dict
+        # to adhere to object access return response dict
+        response_content = parse_json_object(response)
 
         if (
             response.status_code == 200
@@ -67,7 +123,7 @@ def update_object_permissions(
         ):
             return True
 
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"Error updating permissions: {e}")
 
     return False
@@ -81,6 +137,9 @@ def can_access_objects(
     """
     Check if the authenticated user can access the specified data sources.
 
+    A denial (4xx) is remembered for 30 seconds, during which the same check
+    for the same token returns False without calling the API.
+
     Args:
         access_token: Bearer token for authentication
         data_sources: List of data source dictionaries with id and type
@@ -96,14 +155,12 @@ def can_access_objects(
         return True
 
     # Separate web and non-web data sources
-    non_web_data_sources = []
-    for ds in data_sources:
-        # Skip websites and sitemaps - they don't need permission checks
-        if ds.get("type") in ["website/url", "website/sitemap"] or ds.get(
-            "id", ""
-        ).startswith(("http://", "https://")):
-            continue
-        non_web_data_sources.append(ds)
+    non_web_data_sources = [
+        ds
+        for ds in data_sources
+        if ds.get("type") not in _WEB_DATASOURCE_TYPES
+        and not ds.get("id", "").startswith(_WEB_URL_PREFIXES)
+    ]
 
     # If there are no non-web data sources left, return true (all were web URLs)
     if not non_web_data_sources:
@@ -117,30 +174,34 @@ def can_access_objects(
 
     print(f"Checking access for non-web data sources: {access_levels}")
 
-    request_data = {"data": {"dataSources": access_levels}}
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
+    deny_key = (
+        hashlib.blake2b(access_token.encode(), digest_size=16).hexdigest(),
+        permission_level,
+        tuple(sorted(access_levels)),
+    )
+    if _recently_denied(deny_key):
+        print("User was recently denied access to data sources")
+        return False
 
-    permissions_endpoint = os.environ["API_BASE_URL"] + "/utilities/can_access_objects"
+    request_data = {"data": {"dataSources": access_levels}}
+    permissions_endpoint = f"{api_base_url()}/utilities/can_access_objects"
     try:
-        response = requests.post(
-            permissions_endpoint, headers=headers, data=json.dumps(request_data)
-        )
+        response = post_json(_SESSION, permissions_endpoint, request_data, access_token)
 
-        response_content = response.json()
+        response_content = parse_json_object(response)
+        status_code = response.status_code
+        if status_code == 200:
+            status_code = response_content.get("statusCode", None)
 
-        if (
-            response.status_code != 200
-            or response_content.get("statusCode", None) != 200
-        ):
+        if status_code != 200:
             print(f"User does not have access to data sources: {response.status_code}")
+            if isinstance(status_code, int) and 400 <= status_code < 500:
+                _remember_denied(deny_key)
             return False
         else:
             return True
 
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"Error checking access on data sources: {e}")
 
     return False
@@ -150,14 +211,21 @@ def simulate_can_access_objects(
     access_token: str,
     object_ids: List[str],
     permission_levels: Optional[List[str]] = None,
+    executor: Optional[Executor] = None,
 ) -> Dict[str, Dict[str, bool]]:
     """
     Simulate access permissions for specified objects and permission levels.
 
+    Object ids are sent in batches of at most SIMULATE_BATCH_SIZE per request.
+    When there is more than one batch the requests run concurrently and the
+    per-batch results are merged. A batch that fails reports every one of its
+    objects as denied.
+
     Args:
         access_token: Bearer token for authentication
         object_ids: List of object IDs to check access for
         permission_levels: List of permission levels to check (default: ["read"])
+        executor: Executor for concurrent batches (default: the shared pool)
 
     Returns:
         Dict[str, Dict[str, bool]]: Nested dictionary with object IDs as keys and
@@ -167,50 +235,85 @@ def simulate_can_access_objects(
         permission_levels = ["read"]
 
     print(f"Simulating access on data sources: {object_ids}")
+    print(f"With access levels: {permission_levels}")
 
-    access_levels = {id: permission_levels for id in object_ids}
+    permissions_endpoint = f"{api_base_url()}/utilities/simulate_access_to_objects"
 
-    # Set the access levels result for each object to false for every object id
-    # and permission level
-    all_denied = {id: {pl: False for pl in permission_levels} for id in object_ids}
+    chunks = list(_chunked(object_ids, SIMULATE_BATCH_SIZE))
+    if not chunks:
+        return {}
+    if len(chunks) == 1:
+        return _simulate_chunk(
+            access_token, permissions_endpoint, chunks[0], permission_levels
+        )
 
-    print(f"With access levels: {access_levels}")
+    pool = executor if executor is not None else shared_executor()
+    futures = [
+        pool.submit(
+            _simulate_chunk,
+            access_token,
+            permissions_endpoint,
+            chunk,
+            permission_levels,
+        )
+        for chunk in chunks
+    ]
+    results: Dict[str, Dict[str, bool]] = {}
+    for future in futures:
+        results.update(future.result())
+    return results
 
-    request_data = {"data": {"objects": access_levels}}
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
+def _simulate_chunk(
+    access_token: str,
+    permissions_endpoint: str,
+    object_ids: List[str],
+    permission_levels: List[str],
+) -> Dict[str, Dict[str, bool]]:
+    """Simulate access for one batch of object ids, denying all on failure.
 
-    # Replace 'permissions_endpoint' with the actual permissions endpoint URL
-    permissions_endpoint = (
-        os.environ["API_BASE_URL"] + "/utilities/simulate_access_to_objects"
-    )
+    Only the requested objects and permission levels are kept from the
+    response; anything the API leaves out is reported as denied.
+    """
+    request_data = {"data": {"objects": {id: permission_levels for id in object_ids}}}
 
     try:
-        response = requests.post(
-            permissions_endpoint, headers=headers, data=json.dumps(request_data)
-        )
+        response = post_json(_SESSION, permissions_endpoint, request_data, access_token)
 
-        response_content = (
-            response.json()
-        )  # to adhere to object access return response dict
+        # to adhere to object access return response dict
+        response_content = parse_json_object(response)
 
         if (
             response.status_code == 200
             and response_content.get("statusCode", None) == 200
         ):
-            result = response.json()
-            if "data" in result:
-                return result["data"]
-            else:
-                return all_denied
-        else:
-            print("Error simulating user access")
-            return all_denied
+            return _project_access(
+                response_content.get("data") or {}, object_ids, permission_levels
+            )
 
-    except Exception as e:
+        print("Error simulating user access")
+
+    except (requests.RequestException, ValueError) as e:
         print(f"Error simulating access on data sources: {e}")
 
-    return all_denied
+    return _project_access({}, object_ids, permission_levels)
+
+
+def _project_access(
+    data: Dict[str, Dict[str, bool]],
+    object_ids: List[str],
+    permission_levels: List[str],
+) -> Dict[str, Dict[str, bool]]:
+    """Map each requested object id to its requested permission levels."""
+    denied = dict.fromkeys(permission_levels, False)
+    if not data or not isinstance(data, dict):
+        return {object_id: denied.copy() for object_id in object_ids}
+    access = {}
+    for object_id in object_ids:
+        granted = data.get(object_id)
+        access[object_id] = (
+            {pl: granted.get(pl, False) for pl in permission_levels}
+            if granted and isinstance(granted, dict)
+            else denied.copy()
+        )
+    return access
@@ -1,9 +1,32 @@
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional, Protocol
 
-_route_data: Dict[str, Dict[str, Any]] = None
-_permissions_by_state = None
-_op_type: str = "built_in"
+
+class _OpsRegistry:
+    """Holds the route data, permissions and op type injected by a service."""
+
+    __slots__ = ("route_data", "permissions_by_state", "op_type")
+
+    def __init__(self):
+        self.route_data: Optional[Dict[str, Dict[str, Any]]] = None
+        self.permissions_by_state = None
+        self.op_type: str = "built_in"
+
+
+_REG = _OpsRegistry()
+
+# Legacy module attributes, kept readable as ops._route_data and friends
+_LEGACY_ATTRS = {
+    "_route_data": "route_data",
+    "_permissions_by_state": "permissions_by_state",
+    "_op_type": "op_type",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LEGACY_ATTRS:
+        return getattr(_REG, _LEGACY_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class PermissionChecker(Protocol):
@@ -19,8 +42,7 @@ def set_route_data(route_data: Dict[str, Dict[str, Any]]):
     Args:
         route_data: Dictionary containing route configuration data
     """
-    global _route_data
-    _route_data = route_data
+    _REG.route_data = route_data
 
 
 def set_permissions_by_state(
@@ -32,8 +54,24 @@ def set_permissions_by_state(
     Args:
         permissions_by_state: Dictionary mapping states to permission checkers
     """
-    global _permissions_by_state
-    _permissions_by_state = permissions_by_state
+    _REG.permissions_by_state = permissions_by_state
+
+
+def _register_default_permission(path: str) -> bool:
+    """Give ``path`` an allow-all permission unless it already has one.
+
+    Returns:
+        False if no permissions_by_state has been injected yet, else True.
+    """
+    permissions_by_state = _REG.permissions_by_state
+    if permissions_by_state is None:
+        return False
+    if not permissions_by_state.permissions_by_state_type.get(path, None):
+        operation = path.split("/")[-1]
+        permissions_by_state.permissions_by_state_type[path] = {
+            operation: lambda user, data: True
+        }
+    return True
 
 
 def set_op_type(op_type: str):
@@ -43,8 +81,7 @@ def set_op_type(op_type: str):
     Args:
         op_type: The operation type to set as default
     """
-    global _op_type
-    _op_type = op_type
+    _REG.op_type = op_type
 
 
 def api_tool(
@@ -62,6 +99,14 @@ def api_tool(
     """
     Register an API tool/operation with standardized parameters.
 
+    Registration happens at decoration time: the route is added to the injected
+    route_data and, if no permission exists yet for the path, a default
+    allow-all permission is added to the injected permissions_by_state. When
+    permissions_by_state is injected after decoration, the permission is added
+    on the operation's first call instead.
+    route_data is keyed by path, so decorating the same path again replaces
+    the earlier entry.
+
     Args:
         path: The API endpoint path (e.g., "/state/share")
         name: Human-readable name for the operation
@@ -85,34 +130,46 @@ def api_tool(
 
     # This is the actual decorator
     def decorator(func):
+        registry = _REG
+        route_data = registry.route_data
+        entry = {
+            "method": method,
+            "parameters": parameters,  # Input schema
+            "output": output,  # Output schema
+            "tags": tags,
+            "name": name,
+            "description": description,
+            "permissions": permissions or {},
+            "op_type": registry.op_type,
+        }
+
+        # Decorating the same function again (e.g. when a module re-runs its
+        # registration) reuses the registered handler, updating the route
+        # entry if the registration arguments changed
+        if route_data is not None:
+            existing = route_data.get(path)
+            handler = existing.get("handler") if existing else None
+            if getattr(handler, "__wrapped__", None) is func:
+                entry["handler"] = handler
+                if existing != entry:
+                    route_data[path] = entry
+                return handler
+
+        # Permissions are registered when the operation is defined. If
+        # set_permissions_by_state has not been called yet, the first call of
+        # the operation registers them instead.
+        registered = _register_default_permission(path)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-
-            if (
-                _permissions_by_state is not None
-                and not _permissions_by_state.permissions_by_state_type.get(path, None)
-            ):
-                operation = path.split("/")[-1]
-                _permissions_by_state.permissions_by_state_type[path] = {
-                    operation: lambda user, data: True
-                }
-
-            # Call the actual function
-            result = func(*args, **kwargs)
-            return result
-
-        if _route_data is not None:
-            _route_data[path] = {
-                "method": method,
-                "parameters": parameters,  # Input schema
-                "output": output,  # Output schema
-                "tags": tags,
-                "name": name,
-                "description": description,
-                "handler": wrapper,
-                "permissions": permissions or {},
-                "op_type": _op_type,
-            }
+            nonlocal registered
+            if not registered:
+                registered = _register_default_permission(path)
+            return func(*args, **kwargs)
+
+        if route_data is not None:
+            entry["handler"] = wrapper
+            route_data[path] = entry
 
         return wrapper
 
@@ -42,14 +42,15 @@ def send_email(
     try:
         response = requests.post(endpoint, headers=headers, data=json.dumps(request))
         print("Response: ", response.content)
-        response_content = (
-            response.json()
-        )  # to adhere to object access return response dict
-
-        if response.status_code == 200 and response_content.get("success", False):
-            return True
-
-    except Exception as e:
+        response.raise_for_status()
+        # to adhere to object access return response dict
+        response_content = response.json()
+    except (requests.RequestException, ValueError) as e:
         print(f"Error sending email: {e}")
+        return False
+
+    if not isinstance(response_content, dict):
+        print(f"Unexpected email response: {response_content!r}")
+        return False
 
-    return False
+    return response.status_code == 200 and bool(response_content.get("success", False))
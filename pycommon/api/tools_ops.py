@@ -5,8 +5,11 @@ Handles discovery and registration of @api_tool decorated functions within
 Lambda environments.
 """
 
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from pycommon.tools.ops import (
     OperationModel,
@@ -16,6 +19,58 @@ from pycommon.tools.ops import (
     write_ops,
 )
 
+logger = logging.getLogger(__name__)
+
+# Lambda runtime directory. It exists (or not) for the life of the container,
+# so the scan root is resolved once, falling back to the working directory.
+_LAMBDA_TASK_ROOT = "/var/task"
+_SCAN_ROOT = _LAMBDA_TASK_ROOT if os.path.exists(_LAMBDA_TASK_ROOT) else os.getcwd()
+
+# Directories to exclude when include_dirs is empty (exclusion-based approach)
+_EXCLUDED_DIRS = (
+    "schemata",
+    "node_modules",
+    "__pycache__",
+    ".git",
+    ".serverless",
+    "venv",
+    "env",
+    ".pytest_cache",
+    ".vscode",
+    ".idea",
+    "tests",
+)
+
+
+# Python files under the Lambda task root. The deployment package is read-only
+# for the life of the container, so it is walked once; any other root (the
+# working-directory fallback, local development) is walked on every scan.
+_task_root_files: Optional[List[str]] = None
+
+
+def _find_python_files_cached(directory: str) -> List[str]:
+    """Return find_python_files(directory), walking the Lambda task root once.
+
+    Returns:
+        A new list of file paths, which the caller is free to modify.
+    """
+    global _task_root_files
+    if directory != _LAMBDA_TASK_ROOT:
+        return find_python_files(directory)
+
+    if _task_root_files is None:
+        _task_root_files = find_python_files(directory)
+    return list(_task_root_files)
+
+
+@lru_cache(maxsize=32)
+def _dir_pattern(dirs: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Compile a pattern matching paths inside, or ending in, any of ``dirs``.
+
+    A path matches when it contains ``/<dir>/`` or ends with ``/<dir>``.
+    """
+    return re.compile("/(?:%s)(?:/|$)" % "|".join(map(re.escape, dirs)))
+
 
 def api_tools_register_handler(
     include_dirs: List[str] = None,
@@ -43,10 +98,10 @@ def api_tools_register_handler(
     try:
         # Route to appropriate function
         if command == "ls":
-            print("Listing operations")
+            logger.debug("Listing operations")
             result = list_lambda_ops(include_dirs)
         elif command == "register":
-            print("Registering operations")
+            logger.debug("Registering operations")
             result = register_lambda_ops(include_dirs, data, current_user)
         else:
             result = {
@@ -97,22 +152,19 @@ def register_lambda_ops(
                 "operations_count": 0,
             }
 
-        print(f"Register: Using DynamoDB table: {table_name}")
+        logger.debug("Register: Using DynamoDB table: %s", table_name)
 
         # Scan specified directories
-        code_dir = "/var/task"  # Lambda runtime directory
-        print(f"Register: Scanning directory: {code_dir}")
-        print(f"Register: Including directories: {include_dirs}")
+        code_dir = _SCAN_ROOT
+        logger.debug("Register: Scanning directory: %s", code_dir)
+        logger.debug("Register: Including directories: %s", include_dirs)
 
-        # Check if directory exists (same as list function)
-        if not os.path.exists(code_dir):
-            print(f"Register: Directory {code_dir} does not exist!")
-            # Fallback to current working directory
-            code_dir = os.getcwd()
-            print(f"Register: Using current working directory: {code_dir}")
+        if code_dir != _LAMBDA_TASK_ROOT:
+            logger.debug("Register: Directory %s does not exist!", _LAMBDA_TASK_ROOT)
+            logger.debug("Register: Using current working directory: %s", code_dir)
 
         all_ops = _scan_lambda_codebase(code_dir, include_dirs)
-        print(f"Register: Found {len(all_ops)} operations after scanning")
+        logger.debug("Register: Found %d operations after scanning", len(all_ops))
 
         if not all_ops:
             return {
@@ -125,12 +177,13 @@ def register_lambda_ops(
         # Use simple tags
         tags = ["all"] + additional_tags
 
-        print(
-            f"Register: About to register {len(all_ops)} operations with "
-            f"tags: {tags}"
+        logger.debug(
+            "Register: About to register %d operations with tags: %s",
+            len(all_ops),
+            tags,
         )
         for op in all_ops:
-            print(f"  - {op.name} ({op.url})")
+            logger.debug("  - %s (%s)", op.name, op.url)
 
         # Register using existing write_ops function
         write_ops(current_user=current_user, tags=tags, ops=all_ops)
@@ -151,7 +204,7 @@ def register_lambda_ops(
         }
 
     except Exception as e:
-        print(f"Register: Error occurred: {str(e)}")
+        logger.error("Register: Error occurred: %s", e)
         return {
             "success": False,
             "error": f"Registration failed: {str(e)}",
@@ -171,19 +224,16 @@ def list_lambda_ops(include_dirs: List[str]) -> Dict[str, Any]:
     """
     try:
         # Scan specified directories
-        code_dir = "/var/task"  # Lambda runtime directory
-        print(f"Scanning directory: {code_dir}")
-        print(f"Including directories: {include_dirs}")
+        code_dir = _SCAN_ROOT
+        logger.debug("Scanning directory: %s", code_dir)
+        logger.debug("Including directories: %s", include_dirs)
 
-        # Check if directory exists
-        if not os.path.exists(code_dir):
-            print(f"Directory {code_dir} does not exist!")
-            # Fallback to current working directory
-            code_dir = os.getcwd()
-            print(f"Using current working directory: {code_dir}")
+        if code_dir != _LAMBDA_TASK_ROOT:
+            logger.debug("Directory %s does not exist!", _LAMBDA_TASK_ROOT)
+            logger.debug("Using current working directory: %s", code_dir)
 
         all_ops = _scan_lambda_codebase(code_dir, include_dirs)
-        print(f"Found {len(all_ops)} operations after scanning")
+        logger.debug("Found %d operations after scanning", len(all_ops))
 
         if not all_ops:
             return {
@@ -225,7 +275,7 @@ def list_lambda_ops(include_dirs: List[str]) -> Dict[str, Any]:
         }
 
     except Exception as e:
-        print(f"Error in list_lambda_ops: {str(e)}")
+        logger.error("Error in list_lambda_ops: %s", e)
         return {
             "success": False,
             "error": f"Listing failed: {str(e)}",
@@ -251,79 +301,49 @@ def _scan_lambda_codebase(
     Raises:
         Exception: If file system operations or AST parsing fails
     """
-    print(f"Starting scan of directory: {directory}")
+    logger.debug("Starting scan of directory: %s", directory)
 
     # Get all Python files using existing function
-    all_python_files = find_python_files(directory)
-    print(f"Found {len(all_python_files)} Python files total")
-
-    # Directories to exclude when include_dirs is empty (exclusion-based approach)
-    EXCLUDED_DIRS = {
-        "schemata",
-        "node_modules",
-        "__pycache__",
-        ".git",
-        ".serverless",
-        "venv",
-        "env",
-        ".pytest_cache",
-        ".vscode",
-        ".idea",
-        "tests",
-    }
+    all_python_files = _find_python_files_cached(directory)
+    logger.debug("Found %d Python files total", len(all_python_files))
 
     # Filter files based on include_dirs
-    filtered_files = []
-
     if not include_dirs:
         # Exclusion-based: include all files except those in excluded directories
-        for file_path in all_python_files:
-            should_exclude = False
-            for exclude_dir in EXCLUDED_DIRS:
-                if f"/{exclude_dir}/" in file_path or file_path.endswith(
-                    f"/{exclude_dir}"
-                ):
-                    should_exclude = True
-                    break
-
-            if not should_exclude:
-                filtered_files.append(file_path)
-                print(f"Including file: {file_path}")
-
-        print(f"Using exclusion-based filtering (excluded: {EXCLUDED_DIRS})")
+        excluded = _dir_pattern(_EXCLUDED_DIRS)
+        filtered_files = [f for f in all_python_files if not excluded.search(f)]
+        logger.debug("Using exclusion-based filtering (excluded: %s)", _EXCLUDED_DIRS)
     else:
         # Inclusion-based: only include files in specified directories
-        for file_path in all_python_files:
-            should_include = False
-            for include_dir in include_dirs:
-                if f"/{include_dir}/" in file_path or file_path.endswith(
-                    f"/{include_dir}"
-                ):
-                    should_include = True
-                    break
+        included = _dir_pattern(tuple(include_dirs))
+        filtered_files = [f for f in all_python_files if included.search(f)]
 
-            if should_include:
-                filtered_files.append(file_path)
-                print(f"Including file: {file_path}")
+    for file_path in filtered_files:
+        logger.debug("Including file: %s", file_path)
 
-    print(f"After filtering, scanning {len(filtered_files)} files for " f"operations")
+    logger.debug(
+        "After filtering, scanning %d files for operations", len(filtered_files)
+    )
 
     # Extract operations from each file using existing function
     all_ops: List[OperationModel] = []
     for file_path in filtered_files:
         try:
-            print(f"Extracting operations from: {file_path}")
+            logger.debug("Extracting operations from: %s", file_path)
             file_ops = extract_ops_from_file(file_path)
-            print(f"Found {len(file_ops)} operations in {file_path}")
+            logger.debug("Found %d operations in %s", len(file_ops), file_path)
             for op in file_ops:
-                print(
-                    f"  - Operation: {op.name} ({op.method} {op.url}) "
-                    f"tags: {op.tags}"
+                logger.debug(
+                    "  - Operation: %s (%s %s) tags: %s",
+                    op.name,
+                    op.method,
+                    op.url,
+                    op.tags,
                 )
                 print_pretty_ops([op])  # Pass as list
             all_ops.extend(file_ops)
         except Exception as e:
-            print(f"Warning: Could not parse {file_path}: {e}")
+            logger.warning("Could not parse %s: %s", file_path, e)
 
-    print(f"Total operations found: {len(all_ops)}")
+    logger.debug("Total operations found: %d", len(all_ops))
     return all_ops
@@ -1,32 +1,77 @@
-import json
-import os
+import logging
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-import requests
+from ._http import (
+    api_base_url,
+    create_session,
+    parse_json,
+    post_json,
+    shared_executor,
+    warm_on_import,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every call goes to the one API_BASE_URL host, so a small number of host
+# pools with room for concurrent callers is enough
+_SESSION = create_session(pool_connections=4, pool_maxsize=32, retries=2)
+warm_on_import(_SESSION)
 
 
 def load_user_data(access_token, app_id, entity_type, item_id):
-    print("Initiate get user data call")
+    logger.debug("Initiate get user data call")
 
-    endpoint = os.environ["API_BASE_URL"] + "/user-data/get"
+    endpoint = api_base_url() + "/user-data/get"
 
     request = {"data": {"appId": app_id, "entityType": entity_type, "itemId": item_id}}
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
-
     try:
-        response = requests.post(endpoint, headers=headers, data=json.dumps(request))
-        print("Response: ", response.content)
-        response_content = (
-            response.json()
-        )  # to adhere to object access return response dict
+        response = post_json(_SESSION, endpoint, request, access_token)
+        logger.debug("Response: %s", response.content)
+        # to adhere to object access return response dict
+        response_content = parse_json(response)
 
         if response.status_code == 200 and response_content.get("success", False):
             return response_content.get("data", None)
 
     except Exception as e:
-        print(f"Error getting user data: {e}")
+        logger.error("Error getting user data: %s", e)
 
     return None
+
+
+def load_user_data_bulk(
+    access_token: str,
+    items: Iterable[Tuple[str, str, str]],
+    executor: Optional[Executor] = None,
+) -> Dict[Tuple[str, str, str], Any]:
+    """Load several user-data items concurrently.
+
+    The user-data API has no batch endpoint, so each ``(app_id, entity_type,
+    item_id)`` triple is fetched with ``load_user_data`` on ``executor``.
+    The requests share the module's pooled session, so they reuse its open
+    connections.
+
+    Args:
+        access_token (str): Bearer token for API authentication.
+        items (Iterable[Tuple[str, str, str]]): ``(app_id, entity_type,
+            item_id)`` triples to load.
+        executor (Executor, optional): Executor used to run the lookups.
+            Defaults to the package's shared thread pool.
+
+    Returns:
+        Dict[Tuple[str, str, str], Any]: The ``load_user_data`` result for
+            each item, keyed by its ``(app_id, entity_type, item_id)``
+            triple. Failed lookups are None. A repeated triple is fetched
+            once.
+    """
+    items = list(dict.fromkeys(tuple(item) for item in items))
+    if not items:
+        return {}
+
+    pool = executor if executor is not None else shared_executor()
+    futures = [
+        (item, pool.submit(load_user_data, access_token, *item)) for item in items
+    ]
+    return {item: future.result() for item, future in futures}
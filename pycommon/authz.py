@@ -11,23 +11,39 @@ Copyright (c) 2025 Vanderbilt University
 Authors: Jules White, Allen Karns, Karely Rodriguez, Max Moundas, Sam Hays
 """
 
+import copy
+import hashlib
 import json
-import os
+import logging
 import re
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date, datetime
+from functools import lru_cache
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import boto3
 import requests
 from boto3.dynamodb.conditions import Key
+from botocore.config import Config
 from dotenv import load_dotenv
 from jose import jwt
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 from jsonschema import SchemaError
-from jsonschema import validate as json_validate
-from jsonschema.exceptions import ValidationError
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.validators import validator_for
 from requests import Response
 
+from pycommon.api._http import (
+    api_base_url,
+    create_session,
+    env_setting,
+    parse_json,
+    post_json,
+    warm_on_import,
+)
 from pycommon.api_utils import TokenV1
 from pycommon.const import NO_RATE_LIMIT, UNLIMITED, APIAccessType
 from pycommon.decorators import required_env_vars
@@ -42,6 +58,18 @@ from pycommon.exceptions import (
 
 ALGORITHMS = ["RS256"]
 
+# Key type in an api_owner_id such as "user/ownerKey/<id>"; the pattern is
+# non-greedy and safe for typical short strings
+_KEY_TYPE_PATTERN = re.compile(r"/(.*?)Key/")
+
+# Field of the API key item that holds the user for each key type
+_KEY_TYPE_USER_FIELDS = {"owner": "owner", "delegate": "delegate", "system": "systemId"}
+
+# "Bearer <token>" with any surrounding whitespace and a case-insensitive scheme
+_BEARER_TOKEN = re.compile(r"\s*bearer\s+(\S+)\s*\Z", re.IGNORECASE)
+
+logger = logging.getLogger(__name__)
+
 # Globals needed by this file
 load_dotenv(dotenv_path=".env.local")
 
@@ -50,6 +78,46 @@ _validate_rules: Optional[Dict[str, Any]] = None
 _permission_checker: Optional[Callable] = None
 _access_types: Optional[List[str]] = [APIAccessType.FULL_ACCESS.value]
 
+# The installed validation rules flattened by _index_rules to
+# {validator key: {(path, op): (schema, compiled validator)}}, rebuilt
+# whenever rules are installed
+_rule_indexes: Dict[str, Dict[Tuple[str, str], Tuple[dict, Any]]] = {}
+
+# Accounts-table reads in flight, keyed by (table name, user), so concurrent
+# get_claims calls for the same user share one DynamoDB request
+_account_reads: Dict[Tuple[str, str], "Future[dict]"] = {}
+_account_reads_lock = threading.Lock()
+
+# Signing keys of each JWKS URL, stored as (monotonic fetch time, {kid: key})
+_JWKS_TTL_SECONDS = 600
+_jwks_cache: Dict[str, Tuple[float, Dict[Optional[str], dict]]] = {}
+
+
+# Validated get_claims results keyed by (sha256 of the token, settings), each
+# stored with the wall-clock time it stops being served. A token arriving
+# again within AUTHZ_JWT_CACHE_TTL seconds, and before its own exp, skips the
+# signature check and the accounts-table read.
+def _env_number(name: str, default: Any, cast: Callable[[str], Any]) -> Any:
+    """Parse a numeric setting, falling back to ``default`` if unset or invalid."""
+    value = env_setting(name)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r, using %s", name, value, default)
+        return default
+
+
+_CLAIMS_CACHE_TTL = _env_number("AUTHZ_JWT_CACHE_TTL", 5.0, float)
+_CLAIMS_CACHE_MAX = _env_number("AUTHZ_JWT_CACHE_MAX", 10000, int)
+_claims_cache: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+_claims_cache_lock = threading.Lock()
+
+# Pooled session so admin checks against API_BASE_URL reuse connections
+_SESSION = create_session(pool_connections=4, pool_maxsize=32, retries=2)
+warm_on_import(_SESSION)
+
 
 def setup_validated(
     validate_rules: Dict[str, Any],
@@ -63,9 +131,14 @@ def setup_validated(
         permission_checker: Function to check permissions, should accept
                           (user, type, op, data) and return a callable that
                           accepts (user, data)
+
+    Note:
+        The rules are indexed when installed. Call this again after changing
+        them; in-place edits are not seen.
     """
-    global _validate_rules, _permission_checker
+    global _validate_rules, _permission_checker, _rule_indexes
     _validate_rules = validate_rules
+    _rule_indexes = _index_rules(validate_rules)
     _permission_checker = permission_checker
 
 
@@ -75,9 +148,14 @@ def set_validate_rules(validate_rules: Dict[str, Any]):
 
     Args:
         validate_rules: Dictionary containing validation rules for operations
+
+    Note:
+        The rules are indexed when installed. Call this again after changing
+        them; in-place edits are not seen.
     """
-    global _validate_rules
+    global _validate_rules, _rule_indexes
     _validate_rules = validate_rules
+    _rule_indexes = _index_rules(validate_rules)
 
 
 def set_permission_checker(permission_checker: Callable):
@@ -115,26 +193,19 @@ def verify_user_as_admin(access_token: str, purpose: str) -> bool:
     Returns:
         bool: True if the user is an admin, False otherwise.
     """
-    print("Initiating authentication of user as admin.")
-
-    api_base_url = os.environ.get("API_BASE_URL")
+    logger.debug("Initiating authentication of user as admin.")
 
-    endpoint = f"{api_base_url}/amplifymin/auth"
+    endpoint = api_base_url() + "/amplifymin/auth"
 
     request_payload = {"data": {"purpose": purpose}}
 
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
-
     try:
-        response: Response = requests.post(
-            endpoint, headers=headers, data=json.dumps(request_payload)
+        response: Response = post_json(
+            _SESSION, endpoint, request_payload, access_token
         )
 
-        print("Response received:", response.content)
-        response_content: dict = response.json()
+        logger.debug("Response received: %s", response.content)
+        response_content: dict = parse_json(response)
 
         if (
             response.status_code != 200
@@ -143,13 +214,164 @@ def verify_user_as_admin(access_token: str, purpose: str) -> bool:
             return False
         return response_content.get("isAdmin", False)
     except requests.RequestException as e:
-        print(f"Network error during authentication: {e}")
+        logger.error("Network error during authentication: %s", e)
         return False
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON response: {e}")
+    except ValueError as e:
+        logger.error("Error decoding JSON response: %s", e)
         return False
 
 
+@lru_cache(maxsize=1)
+def _dynamodb() -> Any:
+    """Return the process-wide DynamoDB resource.
+
+    Building the resource loads its service model and opens a new connection
+    pool, so it is created once and reused with keep-alive connections.
+    """
+    return boto3.resource(
+        "dynamodb", config=Config(tcp_keepalive=True, max_pool_connections=50)
+    )
+
+
+@lru_cache(maxsize=16)
+def _dynamodb_table(table_name: str) -> Any:
+    """Return the DynamoDB Table for ``table_name`` on the shared resource."""
+    return _dynamodb().Table(table_name)
+
+
+def _get_account_item(table_name: str, user: str) -> dict:
+    """Read a user's item from the accounts table.
+
+    A caller that asks for the same user while another thread's read is in
+    flight waits for that read instead of issuing its own. The result, or the
+    error, is shared by every caller of that read.
+
+    Args:
+        table_name (str): Name of the accounts DynamoDB table.
+        user (str): The user whose item is read.
+
+    Returns:
+        dict: The DynamoDB get_item response.
+    """
+    key = (table_name, user)
+    with _account_reads_lock:
+        future = _account_reads.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _account_reads[key] = future
+
+    if not owner:
+        return future.result()
+
+    try:
+        table = _dynamodb_table(table_name)
+        response = table.get_item(Key={"user": user})
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(response)
+        return response
+    finally:
+        with _account_reads_lock:
+            del _account_reads[key]
+
+
+def _fetch_jwks(jwks_url: str) -> Dict[Optional[str], dict]:
+    """Fetch the JWKS document and index its keys by kid.
+
+    Args:
+        jwks_url (str): URL of the issuer's JWKS document.
+
+    Returns:
+        dict: The JSON Web Keys keyed by their ``kid``.
+
+    Raises:
+        ClaimException: If the JWKS cannot be retrieved or decoded.
+    """
+    try:
+        jwks: Response = requests.get(jwks_url)
+        if not jwks.ok:
+            raise ClaimException(
+                f"Failed to retrieve JWKS from {jwks_url}, status code: {jwks.status_code}"  # noqa: E501
+            )
+        jwks_data: dict = parse_json(jwks)
+    except ValueError as e:
+        print(f"Error decoding JSON response from JWKS: {e}")
+        raise ClaimException("Invalid JWKS response")
+
+    # This datastructure is:
+    # { "keys": [ {}, {}, ... ] }
+    return {key.get("kid"): key for key in jwks_data.get("keys", [])}
+
+
+def _jwks_key(jwks_url: str, kid: Optional[str]) -> dict:
+    """Return the signing key with the given ``kid`` from the issuer's JWKS.
+
+    The JWKS is fetched once per URL and reused for _JWKS_TTL_SECONDS. A kid
+    missing from the cached set triggers an immediate refetch, so rotated
+    keys are picked up without waiting for the TTL. Failures raise and are
+    not cached.
+
+    Args:
+        jwks_url (str): URL of the issuer's JWKS document.
+        kid (str): Key id from the token header.
+
+    Returns:
+        dict: The matching JSON Web Key.
+
+    Raises:
+        ClaimException: If the JWKS cannot be retrieved or decoded, or has no
+                        key with the given kid.
+    """
+    now = time.monotonic()
+    entry = _jwks_cache.get(jwks_url)
+    if entry is None or now - entry[0] >= _JWKS_TTL_SECONDS or kid not in entry[1]:
+        entry = (now, _fetch_jwks(jwks_url))
+        _jwks_cache[jwks_url] = entry
+
+    key = entry[1].get(kid)
+    if key is None:
+        print(f"No RSA key found for kid: {kid}")
+        raise ClaimException("No valid RSA key found in JWKS")
+    return key
+
+
+def _cached_claims(key: tuple) -> Optional[dict]:
+    """Return a deep copy of the claims cached under ``key``, if still fresh.
+
+    The claims, including the nested allowed_access and rate_limit values,
+    reach handler code, so callers never share objects with the cache.
+    """
+    with _claims_cache_lock:
+        entry = _claims_cache.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry[0]:
+            del _claims_cache[key]
+            return None
+        _claims_cache.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+
+def _cache_claims(key: tuple, claims: dict):
+    """Cache validated claims until the TTL passes or the token expires.
+
+    The least recently used entry is dropped once _CLAIMS_CACHE_MAX is
+    exceeded; a TTL or maximum of 0 disables the cache.
+    """
+    expires_at = time.time() + _CLAIMS_CACHE_TTL
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    with _claims_cache_lock:
+        _claims_cache[key] = (expires_at, copy.deepcopy(claims))
+        _claims_cache.move_to_end(key)
+        while len(_claims_cache) > _CLAIMS_CACHE_MAX:
+            _claims_cache.popitem(last=False)
+
+
 @required_env_vars("OAUTH_ISSUER_BASE_URL", "OAUTH_AUDIENCE", "ACCOUNTS_DYNAMO_TABLE")
 def get_claims(token: str) -> dict:
     """Retrieve and validate claims from a JSON Web Token (JWT).
@@ -171,6 +393,11 @@ def get_claims(token: str) -> dict:
         ClaimException: If the token is invalid, the JWKS cannot be retrieved,
                         the RSA key for the token is not found, or the user's
                         claims cannot be validated.
+
+    Note:
+        Validated claims are cached per token for AUTHZ_JWT_CACHE_TTL seconds
+        (default 5), never past the token's ``exp``; AUTHZ_JWT_CACHE_MAX
+        (default 10000) bounds the number of cached tokens.
     """
 
     # https://cognito-idp.<Region>.amazonaws.com/<userPoolId>/.well-known/jwks.json
@@ -180,38 +407,27 @@ def get_claims(token: str) -> dict:
         raise ClaimException("No Valid Access Token Found")
 
     # Guaranteed by required_env_vars decorator
-    oauth_issuer_base_url: str = os.getenv("OAUTH_ISSUER_BASE_URL")  # type: ignore
-    oauth_audience: str = os.getenv("OAUTH_AUDIENCE")  # type: ignore
-    accounts_table_name: str = os.getenv("ACCOUNTS_DYNAMO_TABLE")  # type: ignore
-
-    idp_prefix: str = (os.getenv("IDP_PREFIX") or "").lower()
+    oauth_issuer_base_url: str = env_setting("OAUTH_ISSUER_BASE_URL")  # type: ignore
+    oauth_audience: str = env_setting("OAUTH_AUDIENCE")  # type: ignore
+    accounts_table_name: str = env_setting("ACCOUNTS_DYNAMO_TABLE")  # type: ignore
+
+    idp_prefix: str = (env_setting("IDP_PREFIX") or "").lower()
+
+    cache_key = (
+        hashlib.sha256(token.encode()).digest(),
+        oauth_issuer_base_url,
+        oauth_audience,
+        accounts_table_name,
+        idp_prefix,
+    )
+    cached = _cached_claims(cache_key)
+    if cached is not None:
+        return cached
 
     jwks_url: str = f"{oauth_issuer_base_url}/.well-known/jwks.json"
 
-    # Try to get the jwks here and fail otherwise
-    try:
-        jwks: Response = requests.get(jwks_url)
-        if not jwks.ok:
-            raise ClaimException(
-                f"Failed to retrieve JWKS from {jwks_url}, status code: {jwks.status_code}"  # noqa: E501
-            )
-        jwks_data: dict = jwks.json()
-        header = jwt.get_unverified_header(token)
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON response from JWKS: {e}")
-        raise ClaimException("Invalid JWKS response")
-
-    # This datastructure is:
-    # { "keys": [ {}, {}, ... ] }
-    rsa_key: Optional[dict] = None
-    for key in jwks_data.get("keys", []):
-        if key.get("kid") == header.get("kid"):
-            rsa_key = key
-            break
-
-    if not rsa_key:
-        print(f"No RSA key found for kid: {header.get('kid')}")
-        raise ClaimException("No valid RSA key found in JWKS")
+    header = jwt.get_unverified_header(token)
+    rsa_key = _jwks_key(jwks_url, header.get("kid"))
 
     # Finally, decode
     try:
@@ -240,11 +456,9 @@ def get_claims(token: str) -> dict:
         print(f"User matched pattern, updated to: {user}")
     print(f"Final user value: {user}")
 
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(accounts_table_name)
     account: Optional[str] = None
-    rate_limit: Optional[dict] = NO_RATE_LIMIT
-    response = table.get_item(Key={"user": user})
+    rate_limit: Optional[dict] = dict(NO_RATE_LIMIT)
+    response = _get_account_item(accounts_table_name, user)
     if "Item" not in response:
         print(f"Note: User {user} has no accounts")
 
@@ -268,9 +482,82 @@ def get_claims(token: str) -> dict:
     # current access types include: asssistants, share, dual_embedding,
     # chat, file_upload
     payload["allowed_access"] = [APIAccessType.FULL_ACCESS.value]
+    _cache_claims(cache_key, payload)
     return payload
 
 
+def _compile_schema(schema: dict) -> Any:
+    """Check a JSON schema and return a validator for it.
+
+    Args:
+        schema (dict): The JSON schema.
+
+    Returns:
+        The jsonschema validator instance for the schema.
+
+    Raises:
+        SchemaError: If the schema itself is invalid.
+    """
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def _index_rules(
+    validate_rules: Dict[str, Any], compile_schemas: bool = True
+) -> Dict[str, Dict[Tuple[str, str], Tuple[dict, Any]]]:
+    """Flatten ``rules[key][path][op]`` into one (path, op) map per key.
+
+    Each entry is ``(schema, validator)``. The validator is None when
+    ``compile_schemas`` is false or the schema is invalid; _validate_data then
+    compiles the schema itself, which reports the SchemaError.
+
+    Args:
+        validate_rules (dict): The validation rules.
+        compile_schemas (bool): Whether to compile every schema up front.
+
+    Returns:
+        dict: The flattened entries under ``"validators"`` and
+        ``"api_validators"``; a key without validators maps to an empty dict.
+    """
+    indexes: Dict[str, Dict[Tuple[str, str], Tuple[dict, Any]]] = {}
+    for key in ("validators", "api_validators"):
+        index = {}
+        for path, ops in (validate_rules.get(key) or {}).items():
+            for op, schema in ops.items():
+                validator = None
+                if compile_schemas:
+                    try:
+                        validator = _compile_schema(schema)
+                    except SchemaError:
+                        pass
+                index[(path, op)] = (schema, validator)
+        indexes[key] = index
+    return indexes
+
+
+def _rule_index(
+    validator_rules: Dict[str, Any], key: str
+) -> Dict[Tuple[str, str], Tuple[dict, Any]]:
+    """Return the (path, op) -> (schema, validator) index of ``validator_rules[key]``.
+
+    The installed rules are indexed and compiled once by setup_validated and
+    set_validate_rules, so each request costs a single lookup. Any other
+    rules dict is indexed on every call, without compiling its schemas.
+
+    Args:
+        validator_rules (dict): The validation rules.
+        key (str): ``"validators"`` or ``"api_validators"``.
+
+    Returns:
+        dict: The flattened entries, empty when the rules have no validators
+        under ``key``.
+    """  # noqa: E501
+    if validator_rules is _validate_rules:
+        return _rule_indexes[key]
+    return _index_rules(validator_rules, compile_schemas=False)[key]
+
+
 def _validate_data(
     name: str,
     op: str,
@@ -294,23 +581,27 @@ def _validate_data(
         f"_validate_data called with name={name}, op={op}, api_accessed={api_accessed}"
     )
 
-    validator: dict = validator_rules.get(
-        "api_validators" if api_accessed else "validators", None
-    )
-    print(f"Using {'api_validators' if api_accessed else 'validators'} from rules")
+    key = "api_validators" if api_accessed else "validators"
+    index = _rule_index(validator_rules, key)
+    print(f"Using {key} from rules")
 
-    if not validator:
+    if not index:
         print("No validator found, raising ValidationError")
         raise ValidationError("No validator found for the operation")
 
-    if name in validator and op in validator[name]:
+    entry = index.get((name, op))
+    if entry is not None:
         print(f"Found validator for {name}/{op}")
-        schema: dict = validator[name][op]
+        schema, validator = entry
         validate_data = data
         if schema != {}:
             validate_data = data["data"]
         try:
-            json_validate(instance=validate_data, schema=schema)
+            if validator is None:
+                validator = _compile_schema(schema)
+            error = best_match(validator.iter_errors(validate_data))
+            if error is not None:
+                raise error
             print("JSON validation passed")
         except ValidationError as e:
             print(f"JSON validation failed: {e.message}")
@@ -424,6 +715,18 @@ def _parse_and_validate(
     return [name, data]
 
 
+def _parse_expiration_date(value: str) -> date:
+    """Parse a stored ``YYYY-MM-DD`` API key expiration date.
+
+    Zero-padded dates take the fast ``date.fromisoformat`` path; anything else
+    goes through ``strptime`` so non-padded dates such as ``2025-1-5`` still
+    parse and other ISO forms (``20251231``, ``2025-W01-1``) are rejected.
+    """
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return date.fromisoformat(value)
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
 @required_env_vars("API_KEYS_DYNAMODB_TABLE")
 def api_claims(event: Dict[str, Any], context: dict, token: str) -> Dict[str, Any]:
     """Retrieve and validate API claims based on the provided token.
@@ -445,12 +748,9 @@ def api_claims(event: Dict[str, Any], context: dict, token: str) -> Dict[str, An
         RuntimeError: If an internal server error occurs during the database operation.
     """  # noqa: E501
     print("API route was taken")
-    api_keys_table_name: str = os.getenv("API_KEYS_DYNAMODB_TABLE")  # type: ignore
-
-    # Set up DynamoDB connection
-    dynamodb = boto3.resource("dynamodb")
+    api_keys_table_name: str = env_setting("API_KEYS_DYNAMODB_TABLE")  # type: ignore
 
-    table = dynamodb.Table(api_keys_table_name)
+    table = _dynamodb_table(api_keys_table_name)
 
     # determine if we have a new or old key type
     lookup_value: str = token
@@ -480,10 +780,7 @@ def api_claims(event: Dict[str, Any], context: dict, token: str) -> Dict[str, An
 
     # Optionally check the expiration date if applicable
     expiration_date = item.get("expirationDate")
-    if (
-        expiration_date
-        and datetime.strptime(expiration_date, "%Y-%m-%d") <= datetime.now()
-    ):
+    if expiration_date and _parse_expiration_date(expiration_date) <= date.today():
         print("API key has expired.")
         raise PermissionError("API key has expired.")
 
@@ -544,22 +841,15 @@ def _determine_api_user(data: Dict[str, Any]) -> str:
           additional validation/sanitization may be required.
         - Raises a generic Exception on error; consider using a more specific exception type for production.
     """  # noqa: E501
-    # Precompile regex for efficiency and safety;
-    # pattern is non-greedy and safe for typical short strings.
-    key_type_pattern = re.compile(r"/(.*?)Key/")
-    match: Optional[re.Match] = key_type_pattern.search(data.get("api_owner_id", ""))
+    match: Optional[re.Match] = _KEY_TYPE_PATTERN.search(data.get("api_owner_id", ""))
     key_type: Optional[str] = match.group(1) if match else None
 
-    if key_type == "owner":
-        user = data.get("owner")
-    elif key_type == "delegate":
-        user = data.get("delegate")
-    elif key_type == "system":
-        user = data.get("systemId")
-    else:
+    user_field: Optional[str] = _KEY_TYPE_USER_FIELDS.get(key_type)
+    if user_field is None:
         print("Unknown or missing key type in api_owner_id:", key_type)
         raise UnknownApiUserException("Invalid or unrecognized key type.")
 
+    user = data.get(user_field)
     if not user or not isinstance(user, str):
         raise UnknownApiUserException(
             f"Missing or invalid user identifier for key type '{key_type}'."
@@ -590,10 +880,9 @@ def is_rate_limited(current_user: str, rate_limit: dict) -> Tuple[bool, str]:
     if period == UNLIMITED:
         return False, "No rate limit set"
 
-    cost_calc_table: str = os.getenv("COST_CALCULATIONS_DYNAMO_TABLE")  # type: ignore
+    cost_calc_table: str = env_setting("COST_CALCULATIONS_DYNAMO_TABLE")  # type: ignore
 
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(cost_calc_table)
+    table = _dynamodb_table(cost_calc_table)
     try:
         print("Query cost calculation table")
         response = table.query(KeyConditionExpression=Key("id").eq(current_user))
@@ -647,24 +936,16 @@ def _parse_token(event: Dict[str, Any]) -> str:
     Raises:
         HTTPUnauthorized: If no valid token is found.
     """
-    token: Optional[str] = None
-    normalized_headers: Dict[str, str] = {
-        k.lower(): v for k, v in event["headers"].items()
-    }
-    authorization_key: str = "authorization"
-
-    if authorization_key in normalized_headers:
-        parts: List[str] = normalized_headers[authorization_key].split()
-        if len(parts) == 2:
-            scheme: str
-            scheme, token = parts
-            if scheme.lower() != "bearer":
-                token = None
+    authorization: Optional[str] = None
+    for name, value in event["headers"].items():
+        if name.lower() == "authorization":
+            authorization = value
 
-    if token is None:
+    match = _BEARER_TOKEN.match(authorization) if authorization else None
+    if match is None:
         raise HTTPUnauthorized("No Access Token Found")
 
-    return token
+    return match.group(1)
 
 
 def validated(
@@ -0,0 +1,61 @@
+# =============================================================================
+# Shared pytest fixtures
+# =============================================================================
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from pycommon.api._http import reload_config
+
+
+class FakeResponse:
+    """Lightweight stand-in for requests.Response in client tests."""
+
+    __slots__ = ("status_code", "content", "_raise")
+
+    def __init__(self, status_code=200, payload=None, content=None, raise_exc=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode() if content is None else content
+        self._raise = raise_exc
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self._raise is not None:
+            raise self._raise
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+
+@pytest.fixture(scope="session")
+def make_resp():
+    """Factory for FakeResponse: make_resp(status, payload, content=, raise_exc=)."""
+    return FakeResponse
+
+
+@pytest.fixture(autouse=True)
+def reset_api_config():
+    """Re-read API_BASE_URL in every test, after its env patches apply."""
+    reload_config()
+    yield
+    reload_config()
+
+
+@pytest.fixture(scope="session")
+def thread_pool():
+    """Session-wide thread pool for tests that run work concurrently."""
+    pool = ThreadPoolExecutor(8)
+    yield pool
+    pool.shutdown()
@@ -1,7 +1,6 @@
 # =============================================================================
 # Tests for api/data_sources.py
 # =============================================================================
-import json
 import os
 from unittest.mock import MagicMock, patch
 
@@ -144,12 +143,12 @@ def test_get_data_source_keys_empty_key_after_translation(mock_translate):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
+@patch("pycommon.api.object_permissions._SESSION.post")
 def test_can_access_objects_json_decode_error_line_60(mock_post):
     # Test line 60 in object_permissions.py - JSON decode error
     mock_response = MagicMock()
     mock_response.status_code = 200
-    mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
+    mock_response.content = b"Invalid JSON"
     mock_post.return_value = mock_response
 
     result = can_access_objects("test_token", [{"id": "test", "type": "document"}])
@@ -9,6 +9,7 @@ from pycommon.api.files import (
     delete_file,
     get_file_presigned_url,
     upload_file,
+    upload_files,
     upload_to_presigned_url,
 )
 
@@ -152,6 +153,49 @@ class TestUploadFile:
         assert result["groupId"] is None
 
 
+class TestUploadFiles:
+    """Test cases for the upload_files function."""
+
+    @patch("pycommon.api.files.upload_file")
+    def test_upload_files_preserves_order(self, mock_upload_file, thread_pool):
+        """Test results are returned in input order using the injected pool."""
+        mock_upload_file.side_effect = lambda token, **kwargs: (
+            {"id": kwargs["file_name"]} if kwargs["file_name"] != "b.txt" else None
+        )
+        batch = [
+            {"file_name": name, "file_contents": "x", "file_type": "text/plain"}
+            for name in ("a.txt", "b.txt", "c.txt")
+        ]
+
+        result = upload_files("test_token", batch, executor=thread_pool)
+
+        assert result == [{"id": "a.txt"}, None, {"id": "c.txt"}]
+        assert mock_upload_file.call_count == 3
+        mock_upload_file.assert_any_call(
+            "test_token", file_name="a.txt", file_contents="x", file_type="text/plain"
+        )
+
+    @patch("pycommon.api.files.upload_file")
+    def test_upload_files_empty(self, mock_upload_file, thread_pool):
+        """Test an empty batch returns immediately without submitting work."""
+        assert upload_files("test_token", [], executor=thread_pool) == []
+        mock_upload_file.assert_not_called()
+
+    @patch("pycommon.api.files.upload_file")
+    @patch("pycommon.api.files.shared_executor")
+    def test_upload_files_default_executor(
+        self, mock_shared_executor, mock_upload_file, thread_pool
+    ):
+        """Test the shared module-level pool is used when none is given."""
+        mock_shared_executor.return_value = thread_pool
+        mock_upload_file.return_value = {"id": "key"}
+
+        result = upload_files("test_token", [{"file_name": "a.txt"}])
+
+        assert result == [{"id": "key"}]
+        mock_shared_executor.assert_called_once_with()
+
+
 class TestGetFilePresignedUrl:
     """Test cases for the get_file_presigned_url function."""
 
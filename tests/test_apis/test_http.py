@@ -0,0 +1,185 @@
+# =============================================================================
+# Tests for api/_http.py
+# =============================================================================
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from pycommon.api import _http
+from pycommon.api._http import (
+    api_base_url,
+    auth_headers,
+    create_session,
+    dumps,
+    env_setting,
+    parse_json,
+    parse_json_object,
+    post_json,
+    reload_config,
+    shared_executor,
+    warm_connection,
+    warm_on_import,
+)
+
+
+def test_api_base_url_is_read_once_until_reload():
+    with patch.dict(os.environ, {"API_BASE_URL": "https://a.example.com"}):
+        assert api_base_url() == "https://a.example.com"
+    with patch.dict(os.environ, {"API_BASE_URL": "https://b.example.com"}):
+        assert api_base_url() == "https://a.example.com"
+        reload_config()
+        assert api_base_url() == "https://b.example.com"
+
+
+def test_env_setting_is_read_once_until_reload():
+    with patch.dict(os.environ, {"ACCOUNTS_DYNAMO_TABLE": "accounts-a"}):
+        assert env_setting("ACCOUNTS_DYNAMO_TABLE") == "accounts-a"
+    with patch.dict(os.environ, {"ACCOUNTS_DYNAMO_TABLE": "accounts-b"}):
+        assert env_setting("ACCOUNTS_DYNAMO_TABLE") == "accounts-a"
+        reload_config()
+        assert env_setting("ACCOUNTS_DYNAMO_TABLE") == "accounts-b"
+
+
+@patch.dict(os.environ, {}, clear=True)
+def test_api_base_url_missing_raises_key_error():
+    with pytest.raises(KeyError):
+        api_base_url()
+
+
+def test_create_session_mounts_pooled_adapter():
+    session = create_session(pool_connections=2, pool_maxsize=5, retries=4)
+
+    assert isinstance(session, requests.Session)
+    adapter = session.get_adapter("https://api.example.com")
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 5
+    assert adapter.max_retries.total == 4
+    assert adapter.max_retries.status_forcelist == [502, 503, 504]
+    assert "POST" not in adapter.max_retries.allowed_methods
+    assert session.get_adapter("http://localhost:3000") is adapter
+
+
+def test_create_session_retry_methods():
+    session = create_session(backoff_factor=0.5, retry_methods=["POST"])
+
+    retry = session.get_adapter("https://api.example.com").max_retries
+    assert retry.allowed_methods == frozenset({"POST"})
+    assert retry.backoff_factor == 0.5
+
+
+def test_create_session_returns_independent_sessions():
+    assert create_session() is not create_session()
+
+
+def test_parse_json_decodes_body():
+    response = MagicMock()
+    response.content = b'{"success": true, "data": {"a": [1, 2]}}'
+
+    assert parse_json(response) == {"success": True, "data": {"a": [1, 2]}}
+
+
+def test_parse_json_invalid_body_raises_value_error():
+    response = MagicMock()
+    response.content = b"not json"
+
+    with pytest.raises(ValueError):
+        parse_json(response)
+
+
+def test_parse_json_object_decodes_object():
+    response = MagicMock()
+    response.content = b'{"success": true}'
+
+    assert parse_json_object(response) == {"success": True}
+
+
+@pytest.mark.parametrize("content", [b"[1, 2]", b'"text"', b"null", b"not json"])
+def test_parse_json_object_rejects_other_bodies(content):
+    response = MagicMock()
+    response.content = content
+
+    with pytest.raises(ValueError):
+        parse_json_object(response)
+
+
+def test_auth_headers_are_cached_per_token():
+    headers = auth_headers("token_a")
+
+    assert headers == {
+        "Content-Type": "application/json",
+        "Authorization": "Bearer token_a",
+    }
+    assert auth_headers("token_a") is headers
+    assert auth_headers("token_b")["Authorization"] == "Bearer token_b"
+
+
+def test_auth_headers_are_read_only():
+    with pytest.raises(TypeError):
+        auth_headers("token_a")["Authorization"] = "Bearer other"
+
+
+def test_dumps_returns_compact_bytes():
+    assert dumps({"data": {"ids": ["a", "b"]}}) == b'{"data":{"ids":["a","b"]}}'
+
+
+def test_post_json_sends_serialized_body_with_auth_headers():
+    session = MagicMock()
+
+    response = post_json(session, "https://api.example.com/x", {"a": 1}, "token")
+
+    assert response is session.post.return_value
+    session.post.assert_called_once_with(
+        "https://api.example.com/x",
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": "Bearer token",
+        },
+        data=b'{"a":1}',
+        timeout=(3, 10),
+    )
+
+
+def test_shared_executor_is_lazy_singleton():
+    with patch.object(_http, "_executor", None):
+        first = shared_executor()
+        try:
+            assert shared_executor() is first
+        finally:
+            first.shutdown()
+
+
+def test_warm_connection_heads_api_base_url():
+    session = MagicMock()
+    with patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"}):
+        warm_connection(session)
+
+    session.head.assert_called_once_with("https://api.example.com", timeout=2)
+
+
+def test_warm_connection_ignores_failures():
+    session = MagicMock()
+    session.head.side_effect = requests.ConnectionError("down")
+
+    warm_connection(session, "https://api.example.com")
+
+    with patch.dict(os.environ, {}, clear=True):
+        warm_connection(session)
+
+    session.head.assert_called_once()
+
+
+def test_warm_on_import_is_opt_in():
+    session = MagicMock()
+    with patch.dict(os.environ, {}, clear=True):
+        warm_on_import(session)
+    session.head.assert_not_called()
+
+    with patch.dict(
+        os.environ,
+        {"PYCOMMON_WARM_ON_IMPORT": "1", "API_BASE_URL": "https://api.example.com"},
+    ):
+        warm_on_import(session)
+    session.head.assert_called_once_with("https://api.example.com", timeout=2)
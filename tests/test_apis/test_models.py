@@ -1,30 +1,43 @@
 import os
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
+import pytest
 import requests
 
-from pycommon.api.models import get_default_models
+from pycommon.api._http import reload_config
+from pycommon.api.models import get_default_models, invalidate_default_models_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_default_models_cache():
+    invalidate_default_models_cache()
+    yield
+    invalidate_default_models_cache()
+
+
+def _models_payload(user="gpt-4"):
+    return {"success": True, "data": {"user": user}}
 
 
 class TestGetDefaultModels:
     """Test cases for the get_default_models function."""
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    def test_get_default_models_successful_response(self, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_successful_response(self, mock_get, make_resp):
         """Test get_default_models with successful response containing all fields."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "success": True,
-            "data": {
-                "user": "gpt-4",
-                "cheapest": "gpt-3.5-turbo",
-                "agent": "claude-3-sonnet",
-                "advanced": "gpt-4-turbo",
+        mock_get.return_value = make_resp(
+            200,
+            {
+                "success": True,
+                "data": {
+                    "user": "gpt-4",
+                    "cheapest": "gpt-3.5-turbo",
+                    "agent": "claude-3-sonnet",
+                    "advanced": "gpt-4-turbo",
+                },
             },
-        }
-        mock_get.return_value = mock_response
+        )
 
         result = get_default_models("test_token")
 
@@ -42,16 +55,16 @@ class TestGetDefaultModels:
                 "Content-Type": "application/json",
                 "Authorization": "Bearer test_token",
             },
+            timeout=(3, 10),
         )
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    def test_get_default_models_with_minimal_data(self, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_with_minimal_data(self, mock_get, make_resp):
         """Test get_default_models with minimal response data (only user field)."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True, "data": {"user": "gpt-4"}}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(
+            200, {"success": True, "data": {"user": "gpt-4"}}
+        )
 
         result = get_default_models("test_token")
 
@@ -64,16 +77,16 @@ class TestGetDefaultModels:
         assert result == expected
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    def test_get_default_models_with_partial_data(self, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_with_partial_data(self, mock_get, make_resp):
         """Test get_default_models with partial response data."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "success": True,
-            "data": {"user": "gpt-4", "cheapest": "gpt-3.5-turbo"},
-        }
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(
+            200,
+            {
+                "success": True,
+                "data": {"user": "gpt-4", "cheapest": "gpt-3.5-turbo"},
+            },
+        )
 
         result = get_default_models("test_token")
 
@@ -86,156 +99,141 @@ class TestGetDefaultModels:
         assert result == expected
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_response_not_success(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_response_not_success(self, mock_get, make_resp, caplog):
         """Test get_default_models when response success is False."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": False, "data": {}}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(200, {"success": False, "data": {}})
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing data in default models response")
+        assert caplog.messages == ["Missing data in default models response"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_missing_data_field(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_missing_data_field(self, mock_get, make_resp, caplog):
         """Test get_default_models when response is missing data field."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(200, {"success": True})
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing data in default models response")
+        assert caplog.messages == ["Missing data in default models response"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_empty_response(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_empty_response(self, mock_get, make_resp, caplog):
         """Test get_default_models when response is empty."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(200, {})
+
+        result = get_default_models("test_token")
+
+        assert result == {}
+        assert caplog.messages == ["Missing data in default models response"]
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    @pytest.mark.parametrize(
+        "content", [b"null", b"[]", b'"models"'], ids=["null", "list", "string"]
+    )
+    def test_get_default_models_non_object_response(
+        self, mock_get, make_resp, caplog, content
+    ):
+        """Test get_default_models when the response body is not a JSON object."""
+        mock_get.return_value = make_resp(200, content=content)
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing data in default models response")
+        assert caplog.messages[0].startswith("Error fetching default models:")
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_none_response(self, mock_print, mock_get):
-        """Test get_default_models when response json is None."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = None
-        mock_get.return_value = mock_response
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_non_object_data(self, mock_get, make_resp, caplog):
+        """Test get_default_models when the data field is not an object."""
+        mock_get.return_value = make_resp(200, {"success": True, "data": ["gpt-4"]})
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing data in default models response")
+        assert caplog.messages == ["Missing data in default models response"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_missing_user_model(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_missing_user_model(self, mock_get, make_resp, caplog):
         """Test get_default_models when user model is missing from data."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "success": True,
-            "data": {"cheapest": "gpt-3.5-turbo"},
-        }
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(
+            200,
+            {
+                "success": True,
+                "data": {"cheapest": "gpt-3.5-turbo"},
+            },
+        )
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing default model")
+        assert caplog.messages == ["Missing default model"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_empty_user_model(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_empty_user_model(self, mock_get, make_resp, caplog):
         """Test get_default_models when user model is empty string."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True, "data": {"user": ""}}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(200, {"success": True, "data": {"user": ""}})
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing default model")
+        assert caplog.messages == ["Missing default model"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_none_user_model(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_none_user_model(self, mock_get, make_resp, caplog):
         """Test get_default_models when user model is None."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True, "data": {"user": None}}
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(
+            200, {"success": True, "data": {"user": None}}
+        )
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with("Missing default model")
+        assert caplog.messages == ["Missing default model"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_http_error(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_http_error(self, mock_get, make_resp, caplog):
         """Test get_default_models when HTTP error occurs."""
-        mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
-            "404 Not Found"
+        mock_get.return_value = make_resp(
+            raise_exc=requests.exceptions.HTTPError("404 Not Found")
         )
-        mock_get.return_value = mock_response
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with(
-            "Error fetching default models: 404 Not Found"
-        )
+        assert caplog.messages == ["Error fetching default models: 404 Not Found"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    @patch("builtins.print")
-    def test_get_default_models_request_exception(self, mock_print, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_request_exception(self, mock_get, caplog):
         """Test get_default_models when requests exception occurs."""
         mock_get.side_effect = requests.exceptions.ConnectionError("Connection timeout")
 
         result = get_default_models("test_token")
 
         assert result == {}
-        mock_print.assert_called_once_with(
-            "Error fetching default models: Connection timeout"
-        )
+        assert caplog.messages == ["Error fetching default models: Connection timeout"]
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    def test_get_default_models_with_none_cheapest(self, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_with_none_cheapest(self, mock_get, make_resp):
         """Test get_default_models when cheapest model is None."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "success": True,
-            "data": {"user": "gpt-4", "cheapest": None, "agent": "claude-3-sonnet"},
-        }
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(
+            200,
+            {
+                "success": True,
+                "data": {"user": "gpt-4", "cheapest": None, "agent": "claude-3-sonnet"},
+            },
+        )
 
         result = get_default_models("test_token")
 
@@ -248,16 +246,27 @@ class TestGetDefaultModels:
         assert result == expected
 
     @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.models.requests.get")
-    def test_get_default_models_with_empty_cheapest(self, mock_get):
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_invalid_json(self, mock_get, make_resp, caplog):
+        """Test get_default_models when the response body is not JSON."""
+        mock_get.return_value = make_resp(content=b"<html>Bad Gateway</html>")
+
+        result = get_default_models("test_token")
+
+        assert result == {}
+        assert caplog.messages[0].startswith("Error fetching default models:")
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_get_default_models_with_empty_cheapest(self, mock_get, make_resp):
         """Test get_default_models when cheapest model is empty string."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "success": True,
-            "data": {"user": "gpt-4", "cheapest": "", "advanced": "gpt-4-turbo"},
-        }
-        mock_get.return_value = mock_response
+        mock_get.return_value = make_resp(
+            200,
+            {
+                "success": True,
+                "data": {"user": "gpt-4", "cheapest": "", "advanced": "gpt-4-turbo"},
+            },
+        )
 
         result = get_default_models("test_token")
 
@@ -268,3 +277,105 @@ class TestGetDefaultModels:
             "advanced_model": "gpt-4-turbo",
         }
         assert result == expected
+
+
+class TestGetDefaultModelsCache:
+    """Test cases for the get_default_models TTL cache."""
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_repeat_call_is_served_from_cache(self, mock_get, make_resp):
+        mock_get.return_value = make_resp(200, _models_payload())
+
+        first = get_default_models("test_token")
+        second = get_default_models("test_token")
+
+        assert first == second
+        assert first["user_model"] == "gpt-4"
+        mock_get.assert_called_once()
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_cached_result_is_a_copy(self, mock_get, make_resp):
+        mock_get.return_value = make_resp(200, _models_payload())
+
+        get_default_models("test_token")["user_model"] = "mutated"
+
+        assert get_default_models("test_token")["user_model"] == "gpt-4"
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_tokens_are_cached_separately(self, mock_get, make_resp):
+        mock_get.side_effect = [
+            make_resp(200, _models_payload("gpt-4")),
+            make_resp(200, _models_payload("o1")),
+        ]
+
+        assert get_default_models("token_a")["user_model"] == "gpt-4"
+        assert get_default_models("token_b")["user_model"] == "o1"
+        assert mock_get.call_count == 2
+
+    @patch("pycommon.api.models._SESSION.get")
+    def test_base_url_change_misses_cache(self, mock_get, make_resp):
+        mock_get.side_effect = [
+            make_resp(200, _models_payload("gpt-4")),
+            make_resp(200, _models_payload("o1")),
+        ]
+
+        with patch.dict(os.environ, {"API_BASE_URL": "https://a.example.com"}):
+            assert get_default_models("test_token")["user_model"] == "gpt-4"
+        with patch.dict(os.environ, {"API_BASE_URL": "https://b.example.com"}):
+            reload_config()
+            assert get_default_models("test_token")["user_model"] == "o1"
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models.time.monotonic")
+    @patch("pycommon.api.models._SESSION.get")
+    def test_entry_expires_after_ttl(self, mock_get, mock_monotonic, make_resp):
+        mock_get.side_effect = [
+            make_resp(200, _models_payload("gpt-4")),
+            make_resp(200, _models_payload("o1")),
+        ]
+        mock_monotonic.side_effect = [1000.0, 1299.0, 1300.0]
+
+        assert get_default_models("test_token")["user_model"] == "gpt-4"
+        assert get_default_models("test_token")["user_model"] == "gpt-4"
+        assert get_default_models("test_token")["user_model"] == "o1"
+        assert mock_get.call_count == 2
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_failures_are_not_cached(self, mock_get, make_resp):
+        mock_get.side_effect = [
+            requests.exceptions.ConnectionError("down"),
+            make_resp(200, _models_payload()),
+        ]
+
+        assert get_default_models("test_token") == {}
+        assert get_default_models("test_token")["user_model"] == "gpt-4"
+        assert mock_get.call_count == 2
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_least_recently_used_entry_is_evicted(self, mock_get, make_resp):
+        mock_get.side_effect = lambda *args, **kwargs: make_resp(200, _models_payload())
+
+        for i in range(129):
+            get_default_models(f"token_{i}")
+        assert mock_get.call_count == 129
+
+        get_default_models("token_128")
+        assert mock_get.call_count == 129
+        get_default_models("token_0")
+        assert mock_get.call_count == 130
+
+    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
+    @patch("pycommon.api.models._SESSION.get")
+    def test_invalidate_forces_refetch(self, mock_get, make_resp):
+        mock_get.return_value = make_resp(200, _models_payload())
+
+        get_default_models("test_token")
+        invalidate_default_models_cache()
+        get_default_models("test_token")
+
+        assert mock_get.call_count == 2
@@ -2,23 +2,34 @@
 # Tests for api/object_permissions.py
 # =============================================================================
 
+import json
 import os
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
+import pytest
+import requests
+
+from pycommon.api import object_permissions
 from pycommon.api.object_permissions import (
+    _SESSION,
+    SIMULATE_BATCH_SIZE,
     can_access_objects,
     simulate_can_access_objects,
     update_object_permissions,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_deny_cache():
+    object_permissions._deny_cache.clear()
+    yield
+    object_permissions._deny_cache.clear()
+
+
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_update_object_permissions_success(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"statusCode": 200}
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_update_object_permissions_success(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, {"statusCode": 200})
 
     result = update_object_permissions(
         "test_token", ["user1@test.com"], ["key1"], "file"
@@ -28,12 +39,9 @@ def test_update_object_permissions_success(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_update_object_permissions_failure(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"statusCode": 400}
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_update_object_permissions_failure(mock_post, make_resp):
+    mock_post.return_value = make_resp(400, {"statusCode": 400})
 
     result = update_object_permissions(
         "test_token", ["user1@test.com"], ["key1"], "file"
@@ -43,9 +51,9 @@ def test_update_object_permissions_failure(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
+@patch("pycommon.api.object_permissions._SESSION.post")
 def test_update_object_permissions_exception(mock_post):
-    mock_post.side_effect = Exception("Network error")
+    mock_post.side_effect = requests.ConnectionError("Network error")
 
     result = update_object_permissions(
         "test_token", ["user1@test.com"], ["key1"], "file"
@@ -55,7 +63,7 @@ def test_update_object_permissions_exception(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
+@patch("pycommon.api.object_permissions._SESSION.post")
 def test_can_access_objects_empty_data_sources(mock_post):
     result = can_access_objects("test_token", [])
     assert result is True
@@ -63,7 +71,7 @@ def test_can_access_objects_empty_data_sources(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
+@patch("pycommon.api.object_permissions._SESSION.post")
 def test_can_access_objects_web_sources_only(mock_post):
     data_sources = [
         {"id": "http://example.com", "type": "website/url"},
@@ -75,12 +83,26 @@ def test_can_access_objects_web_sources_only(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_can_access_objects_success(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"statusCode": 200, "success": True}
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_skips_web_sources_in_mixed_list(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, {"statusCode": 200})
+
+    data_sources = [
+        {"id": "sitemap-1", "type": "website/sitemap"},
+        {"id": "https://example.com/page", "type": "text/html"},
+        {"id": "s3://bucket/file.txt", "type": "file"},
+    ]
+    result = can_access_objects("test_token", data_sources)
+
+    assert result is True
+    body = json.loads(mock_post.call_args.kwargs["data"])
+    assert body == {"data": {"dataSources": {"bucket/file.txt": "read"}}}
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_success(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, {"statusCode": 200, "success": True})
 
     data_sources = [{"id": "file://test.txt", "type": "file"}]
     result = can_access_objects("test_token", data_sources)
@@ -89,12 +111,9 @@ def test_can_access_objects_success(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_can_access_objects_success_elif_branch(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"statusCode": 200, "success": True}
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_success_elif_branch(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, {"statusCode": 200, "success": True})
 
     data_sources = [{"id": "s3://bucket/file.txt", "type": "file"}]
     result = can_access_objects("test_token", data_sources)
@@ -103,12 +122,9 @@ def test_can_access_objects_success_elif_branch(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_can_access_objects_failure(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 403
-    mock_response.json.return_value = {"statusCode": 403}
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_failure(mock_post, make_resp):
+    mock_post.return_value = make_resp(403, {"statusCode": 403})
 
     data_sources = [{"id": "s3://bucket/key", "type": "text/plain"}]
     result = can_access_objects("test_token", data_sources)
@@ -117,15 +133,15 @@ def test_can_access_objects_failure(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_simulate_can_access_objects_success(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "statusCode": 200,
-        "data": {"obj1": {"read": True}},
-    }
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_success(mock_post, make_resp):
+    mock_post.return_value = make_resp(
+        200,
+        {
+            "statusCode": 200,
+            "data": {"obj1": {"read": True}},
+        },
+    )
 
     result = simulate_can_access_objects("test_token", ["obj1"])
 
@@ -133,15 +149,15 @@ def test_simulate_can_access_objects_success(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_simulate_can_access_objects_success_elif_branch(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "statusCode": 200,
-        "data": {"obj2": {"read": False}},
-    }
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_success_elif_branch(mock_post, make_resp):
+    mock_post.return_value = make_resp(
+        200,
+        {
+            "statusCode": 200,
+            "data": {"obj2": {"read": False}},
+        },
+    )
 
     result = simulate_can_access_objects("test_token", ["obj2"], ["read"])
 
@@ -149,12 +165,9 @@ def test_simulate_can_access_objects_success_elif_branch(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_simulate_can_access_objects_failure(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"statusCode": 400}
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_failure(mock_post, make_resp):
+    mock_post.return_value = make_resp(400, {"statusCode": 400})
 
     result = simulate_can_access_objects("test_token", ["obj1", "obj2"])
 
@@ -163,12 +176,9 @@ def test_simulate_can_access_objects_failure(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_simulate_can_access_objects_json_decode_error(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.side_effect = ValueError("JSON decode error")
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_json_decode_error(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, content=b"not json")
 
     result = simulate_can_access_objects("test_token", ["obj1"], ["read"])
     # Should return all denied access when JSON decode fails
@@ -176,13 +186,10 @@ def test_simulate_can_access_objects_json_decode_error(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_simulate_can_access_objects_final_return_line_189(mock_post):
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_final_return_line_189(mock_post, make_resp):
     # Mock a scenario where neither success nor exception paths are taken
-    mock_response = MagicMock()
-    mock_response.status_code = 500  # Server error, but no exception
-    mock_response.json.return_value = {"statusCode": 500}
-    mock_post.return_value = mock_response
+    mock_post.return_value = make_resp(500, {"statusCode": 500})
 
     result = simulate_can_access_objects("test_token", ["obj1"], ["read"])
     # Should return all denied access as final fallback
@@ -191,9 +198,9 @@ def test_simulate_can_access_objects_final_return_line_189(mock_post):
 
 # Additional coverage tests for object_permissions.py
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
+@patch("pycommon.api.object_permissions._SESSION.post")
 def test_can_access_objects_exception_lines_60_64(mock_post):
-    mock_post.side_effect = Exception("Network error")
+    mock_post.side_effect = requests.ConnectionError("Network error")
 
     data_sources = [{"id": "s3://bucket/key", "type": "text/plain"}]
     result = can_access_objects("test_token", data_sources)
@@ -202,13 +209,274 @@ def test_can_access_objects_exception_lines_60_64(mock_post):
 
 
 @patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.object_permissions.requests.post")
-def test_simulate_can_access_objects_final_return(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"statusCode": 200}  # No "data" key
-    mock_post.return_value = mock_response
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_final_return(mock_post, make_resp):
+    # No "data" key
+    mock_post.return_value = make_resp(200, {"statusCode": 200})
 
     result = simulate_can_access_objects("test_token", ["obj1"], ["read"])
     # Should return all denied when no data key is present
     assert result == {"obj1": {"read": False}}
+
+
+def _simulate_payload(objects):
+    return {"statusCode": 200, "data": {obj: {"read": True} for obj in objects}}
+
+
+def _simulate_by_body(make_resp, fail_on=None):
+    """Answer each simulate request from its own body, in any call order."""
+
+    def respond(url, headers=None, data=None, timeout=None):
+        objects = json.loads(data)["data"]["objects"]
+        if fail_on in objects:
+            raise requests.ConnectionError("Network error")
+        return make_resp(200, _simulate_payload(objects))
+
+    return respond
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_batches_requests(
+    mock_post, make_resp, thread_pool
+):
+    object_ids = [f"obj{i}" for i in range(SIMULATE_BATCH_SIZE * 2 + 1)]
+    mock_post.side_effect = _simulate_by_body(make_resp)
+
+    result = simulate_can_access_objects("test_token", object_ids, executor=thread_pool)
+
+    assert mock_post.call_count == 3
+    assert result == {obj: {"read": True} for obj in object_ids}
+    batch_sizes = sorted(
+        len(json.loads(call.kwargs["data"])["data"]["objects"])
+        for call in mock_post.call_args_list
+    )
+    assert batch_sizes == [1, SIMULATE_BATCH_SIZE, SIMULATE_BATCH_SIZE]
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_failed_batch_is_denied(
+    mock_post, make_resp, thread_pool
+):
+    object_ids = [f"obj{i}" for i in range(SIMULATE_BATCH_SIZE + 1)]
+    mock_post.side_effect = _simulate_by_body(make_resp, fail_on=object_ids[-1])
+
+    result = simulate_can_access_objects("test_token", object_ids, executor=thread_pool)
+
+    assert result[object_ids[0]] == {"read": True}
+    assert result[object_ids[-1]] == {"read": False}
+    assert len(result) == len(object_ids)
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions.shared_executor")
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_uses_shared_executor(
+    mock_post, mock_shared_executor, make_resp, thread_pool
+):
+    mock_shared_executor.return_value = thread_pool
+    mock_post.side_effect = _simulate_by_body(make_resp)
+    object_ids = [f"obj{i}" for i in range(SIMULATE_BATCH_SIZE + 1)]
+
+    result = simulate_can_access_objects("test_token", object_ids)
+
+    assert len(result) == len(object_ids)
+    mock_shared_executor.assert_called_once_with()
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_no_ids(mock_post):
+    assert simulate_can_access_objects("test_token", []) == {}
+    mock_post.assert_not_called()
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_unexpected_error_propagates(mock_post):
+    mock_post.side_effect = RuntimeError("bug")
+
+    with pytest.raises(RuntimeError):
+        can_access_objects("test_token", [{"id": "s3://bucket/key", "type": "file"}])
+
+
+def test_session_retries_posts():
+    retry = _SESSION.get_adapter("https://api.example.com").max_retries
+
+    assert retry.allowed_methods == frozenset({"GET", "POST"})
+    assert retry.backoff_factor == 0.2
+
+
+_PRIVATE_SOURCES = [{"id": "s3://bucket/key", "type": "text/plain"}]
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_denial_is_cached(mock_post, make_resp):
+    mock_post.return_value = make_resp(403, {"statusCode": 403})
+
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is False
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is False
+
+    mock_post.assert_called_once()
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_body_denial_is_cached(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, {"statusCode": 401})
+
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is False
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is False
+
+    mock_post.assert_called_once()
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_denial_is_scoped_to_token_and_level(mock_post, make_resp):
+    mock_post.return_value = make_resp(403, {"statusCode": 403})
+
+    can_access_objects("test_token", _PRIVATE_SOURCES)
+    can_access_objects("other_token", _PRIVATE_SOURCES)
+    can_access_objects("test_token", _PRIVATE_SOURCES, permission_level="write")
+
+    assert mock_post.call_count == 3
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions.time.monotonic")
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_denial_expires(mock_post, mock_monotonic, make_resp):
+    mock_post.side_effect = [
+        make_resp(403, {"statusCode": 403}),
+        make_resp(200, {"statusCode": 200}),
+    ]
+    mock_monotonic.side_effect = [100.0, 100.0, 130.0]
+
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is False
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is True
+    assert mock_post.call_count == 2
+    assert not object_permissions._deny_cache
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_deny_key_does_not_hold_token(mock_post, make_resp):
+    mock_post.return_value = make_resp(403, {"statusCode": 403})
+
+    can_access_objects("secret_token", _PRIVATE_SOURCES)
+
+    (key,) = object_permissions._deny_cache
+    assert "secret_token" not in repr(key)
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_can_access_objects_server_error_is_not_cached(mock_post, make_resp):
+    mock_post.return_value = make_resp(500, {"statusCode": 500})
+
+    can_access_objects("test_token", _PRIVATE_SOURCES)
+    can_access_objects("test_token", _PRIVATE_SOURCES)
+
+    assert mock_post.call_count == 2
+
+
+@patch("pycommon.api.object_permissions.time.monotonic")
+def test_remember_denied_prunes_expired_entries(mock_monotonic):
+    cache = object_permissions._deny_cache
+    mock_monotonic.side_effect = [0.0, 15.0, 40.0]
+
+    object_permissions._remember_denied(("t", "read", ("old",)))
+    object_permissions._remember_denied(("t", "read", ("recent",)))
+    object_permissions._remember_denied(("t", "read", ("new",)))
+
+    assert set(cache) == {("t", "read", ("recent",)), ("t", "read", ("new",))}
+
+
+@patch("pycommon.api.object_permissions._DENY_CACHE_MAX_ENTRIES", 2)
+@patch("pycommon.api.object_permissions.time.monotonic")
+def test_remember_denied_clears_when_all_entries_are_fresh(mock_monotonic):
+    cache = object_permissions._deny_cache
+    mock_monotonic.side_effect = [0.0, 1.0, 2.0]
+
+    object_permissions._remember_denied(("t", "read", ("a",)))
+    object_permissions._remember_denied(("t", "read", ("b",)))
+    object_permissions._remember_denied(("t", "read", ("c",)))
+
+    assert set(cache) == {("t", "read", ("c",))}
+
+
+@patch("pycommon.api.object_permissions._DENY_CACHE_MAX_ENTRIES", 16)
+def test_remember_denied_is_safe_across_threads(thread_pool):
+    def deny_many(worker):
+        for i in range(500):
+            object_permissions._remember_denied(("t", "read", (f"{worker}-{i}",)))
+            object_permissions._recently_denied(("t", "read", (f"{worker}-{i}",)))
+
+    for future in [thread_pool.submit(deny_many, worker) for worker in range(8)]:
+        future.result(timeout=10)
+
+    assert 0 < len(object_permissions._deny_cache) <= 16
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_keeps_only_requested_access(mock_post, make_resp):
+    mock_post.return_value = make_resp(
+        200,
+        {
+            "statusCode": 200,
+            "data": {
+                "obj1": {"read": True, "write": True, "owner": False},
+                "unrequested": {"read": True},
+            },
+        },
+    )
+
+    result = simulate_can_access_objects(
+        "test_token", ["obj1", "obj2"], ["read", "write", "admin"]
+    )
+
+    assert result == {
+        "obj1": {"read": True, "write": True, "admin": False},
+        "obj2": {"read": False, "write": False, "admin": False},
+    }
+
+
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_non_object_body_is_treated_as_failure(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, content=b"[1]")
+
+    assert (
+        update_object_permissions("test_token", ["user1@test.com"], ["key1"], "file")
+        is False
+    )
+    assert can_access_objects("test_token", _PRIVATE_SOURCES) is False
+    assert simulate_can_access_objects("test_token", ["obj1"], ["read"]) == {
+        "obj1": {"read": False}
+    }
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (["obj1"], {"obj1": {"read": False}, "obj2": {"read": False}}),
+        (
+            {"obj1": "read", "obj2": {"read": True}},
+            {"obj1": {"read": False}, "obj2": {"read": True}},
+        ),
+    ],
+)
+@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
+@patch("pycommon.api.object_permissions._SESSION.post")
+def test_simulate_can_access_objects_malformed_data(
+    mock_post, make_resp, data, expected
+):
+    mock_post.return_value = make_resp(200, {"statusCode": 200, "data": data})
+
+    result = simulate_can_access_objects("test_token", ["obj1", "obj2"], ["read"])
+
+    assert result == expected
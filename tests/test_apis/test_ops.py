@@ -2,7 +2,8 @@
 # Tests for api/ops.py
 # =============================================================================
 
-from unittest.mock import MagicMock
+import re
+from types import SimpleNamespace
 
 import pytest
 
@@ -15,6 +16,30 @@ from pycommon.api.ops import (
     set_route_data,
 )
 
+# Message api_tool raises for an unsupported method; group 1 is the method
+_METHOD_ERROR = re.compile(r"Method must be either 'GET' or 'POST', got '(.+)'")
+
+# Shared api_tool arguments; api_tool stores them by reference and never
+# mutates them
+_PARAMS = {"type": "object"}
+_DESC = "A test tool"
+
+
+@pytest.fixture(autouse=True)
+def ops_state(monkeypatch):
+    """Give each test its own ops registry state, undone by monkeypatch.
+
+    Nothing is shared between tests, so the module is safe to run under
+    pytest-xdist.
+    """
+    monkeypatch.setattr(ops._REG, "route_data", {"dummy": {}})
+    monkeypatch.setattr(ops._REG, "op_type", "test")
+    monkeypatch.setattr(ops._REG, "permissions_by_state", None)
+
+
+def _ok():
+    return {"result": "success"}
+
 
 def test_permission_checker_protocol():
     """Test that PermissionChecker protocol can be used for type hints and
@@ -39,40 +64,46 @@ def test_permission_checker_protocol():
     assert func_checker("user", {}) is False
 
 
-def test_set_route_data():
-    test_data = {"/test": {"method": "POST"}}
-    set_route_data(test_data)
+@pytest.mark.parametrize(
+    "setter, attr, value",
+    [
+        (set_route_data, "_route_data", {"/test": {"method": "POST"}}),
+        (
+            set_permissions_by_state,
+            "_permissions_by_state",
+            {"/test": {"read": lambda user, data: True}},
+        ),
+        (set_op_type, "_op_type", "custom"),
+    ],
+    ids=["route_data", "permissions_by_state", "op_type"],
+)
+def test_setters(setter, attr, value):
+    setter(value)
 
-    assert ops._route_data == test_data
+    assert getattr(ops, attr) == value
 
 
-def test_set_permissions_by_state():
-    test_permissions = {"/test": {"read": lambda user, data: True}}
-    set_permissions_by_state(test_permissions)
+def test_legacy_module_attributes_read_registry():
+    set_route_data({"/legacy": {}})
+    set_op_type("legacy")
+    set_permissions_by_state(None)
 
-    assert ops._permissions_by_state == test_permissions
+    assert ops._route_data is ops._REG.route_data
+    assert ops._op_type == "legacy"
+    assert ops._permissions_by_state is None
 
 
-def test_set_op_type():
-    set_op_type("custom")
-
-    assert ops._op_type == "custom"
+def test_unknown_module_attribute_raises():
+    with pytest.raises(AttributeError, match="has no attribute '_missing'"):
+        ops._missing
 
 
 def test_api_tool_decorator():
-    # Reset global state
-    # Set _route_data to a non-empty dict since the decorator only populates it
-    # if it's truthy
-    set_route_data({"dummy": {}})
-    set_op_type("test")
-    # Reset permissions_by_state to None to avoid the AttributeError
-    set_permissions_by_state(None)
-
     @api_tool(
         path="/test",
         name="Test Tool",
-        description="A test tool",
-        parameters={"type": "object"},
+        description=_DESC,
+        parameters=_PARAMS,
         method="GET",
     )
     def test_function():
@@ -86,16 +117,70 @@ def test_api_tool_decorator():
     assert ops._route_data["/test"]["method"] == "GET"
 
 
+def test_api_tool_redecorating_path_replaces_entry():
+    route_data = {}
+    set_route_data(route_data)
+
+    @api_tool(path="/state/dup", name="First", description="First definition")
+    def first():
+        return "first"
+
+    @api_tool(path="/state/dup", name="Second", description="Second definition")
+    def second():
+        return "second"
+
+    assert list(route_data) == ["/state/dup"]
+    assert route_data["/state/dup"]["name"] == "Second"
+    assert route_data["/state/dup"]["handler"]() == "second"
+
+
+def test_api_tool_redecorating_same_function_reuses_handler():
+    route_data = {}
+    set_route_data(route_data)
+
+    def operation():
+        return "result"
+
+    tool = api_tool(path="/state/same", name="Same", description="Same function")
+    first = tool(operation)
+    entry = route_data["/state/same"]
+    second = tool(operation)
+
+    assert second is first
+    assert route_data["/state/same"] is entry
+    assert list(route_data) == ["/state/same"]
+    assert second() == "result"
+
+
+def test_api_tool_redecorating_same_function_updates_changed_entry():
+    route_data = {}
+    set_route_data(route_data)
+
+    def operation():
+        return "result"
+
+    first = api_tool(path="/state/same", name="Old", description="Old")(operation)
+    set_op_type("custom")
+    second = api_tool(path="/state/same", name="New", description="New", method="GET")(
+        operation
+    )
+
+    entry = route_data["/state/same"]
+    assert second is first
+    assert entry["handler"] is first
+    assert (entry["name"], entry["description"]) == ("New", "New")
+    assert (entry["method"], entry["op_type"]) == ("GET", "custom")
+
+
 def test_api_tool_decorator_without_route_data():
-    # Reset global state to None to test the condition where _route_data is None
+    # Set _route_data to None to test the condition where it is not populated
     set_route_data(None)
-    set_op_type("test")
 
     @api_tool(
         path="/test",
         name="Test Tool",
-        description="A test tool",
-        parameters={"type": "object"},
+        description=_DESC,
+        parameters=_PARAMS,
         method="GET",
     )
     def test_function():
@@ -109,18 +194,16 @@ def test_api_tool_decorator_without_route_data():
 
 
 def test_api_tool_decorator_permissions_by_state_lines_71_72():
-    # Create a mock permissions object with permissions_by_state_type attribute
-    mock_permissions = MagicMock()
-    mock_permissions.permissions_by_state_type = {}
+    # Create a stub permissions object with permissions_by_state_type attribute
+    mock_permissions = SimpleNamespace(permissions_by_state_type={})
 
     set_permissions_by_state(mock_permissions)
-    set_route_data({"dummy": {}})  # Ensure route_data is truthy
 
     @api_tool(
         path="/test_path",
         name="Test Tool",
-        description="A test tool",
-        parameters={"type": "object"},
+        description=_DESC,
+        parameters=_PARAMS,
         method="GET",
     )
     def test_function():
@@ -133,22 +216,59 @@ def test_api_tool_decorator_permissions_by_state_lines_71_72():
     assert "/test_path" in mock_permissions.permissions_by_state_type
 
 
+def test_api_tool_registers_permissions_at_decoration_time():
+    mock_permissions = SimpleNamespace(permissions_by_state_type={})
+    set_permissions_by_state(mock_permissions)
+
+    @api_tool(
+        path="/state/decorated",
+        name="Decorated Tool",
+        description="Registered without being called",
+    )
+    def test_function():
+        return {"result": "success"}
+
+    permissions = mock_permissions.permissions_by_state_type["/state/decorated"]
+    assert permissions["decorated"]("user", {}) is True
+
+    # Calling the operation does not touch the registered permissions
+    mock_permissions.permissions_by_state_type.clear()
+    assert test_function() == {"result": "success"}
+    assert mock_permissions.permissions_by_state_type == {}
+
+
+def test_api_tool_registers_permissions_on_call_when_state_set_late():
+    @api_tool(path="/state/late", name="Late Tool", description="Late state")
+    def test_function():
+        return {"result": "success"}
+
+    mock_permissions = SimpleNamespace(permissions_by_state_type={})
+    set_permissions_by_state(mock_permissions)
+
+    assert test_function() == {"result": "success"}
+    permissions = mock_permissions.permissions_by_state_type["/state/late"]
+    assert permissions["late"]("user", {}) is True
+
+    # Registration happens once; later calls leave the permissions alone
+    mock_permissions.permissions_by_state_type.clear()
+    test_function()
+    assert mock_permissions.permissions_by_state_type == {}
+
+
 # NEW TEST: Cover branch 10->exit (early return when permissions already exist)
 def test_api_tool_decorator_permissions_already_exist():
-    # Create a mock permissions object with pre-existing path
-    mock_permissions = MagicMock()
-    mock_permissions.permissions_by_state_type = {
-        "/existing_path": {"read": lambda user, data: True}
-    }
+    # Create a stub permissions object with pre-existing path
+    mock_permissions = SimpleNamespace(
+        permissions_by_state_type={"/existing_path": {"read": lambda user, data: True}}
+    )
 
     set_permissions_by_state(mock_permissions)
-    set_route_data({"dummy": {}})  # Ensure route_data is truthy
 
     @api_tool(
         path="/existing_path",
         name="Existing Tool",
         description="A tool with existing permissions",
-        parameters={"type": "object"},
+        parameters=_PARAMS,
         method="GET",
     )
     def test_function():
@@ -162,95 +282,43 @@ def test_api_tool_decorator_permissions_already_exist():
     assert "read" in mock_permissions.permissions_by_state_type["/existing_path"]
 
 
-def test_api_tool_decorator_method_validation():
-    """Test that api_tool validates method parameter correctly."""
-    # Reset global state
-    set_route_data({"dummy": {}})
-    set_op_type("test")
-    set_permissions_by_state(None)
-
-    # Test valid methods: GET
-    @api_tool(
-        path="/test_get",
-        name="Test GET Tool",
-        description="A test GET tool",
-        parameters={"type": "object"},
-        method="GET",
-    )
-    def test_function_get():
-        return {"result": "success"}
-
-    result = test_function_get()
-    assert result == {"result": "success"}
-
-    assert "/test_get" in ops._route_data
-    assert ops._route_data["/test_get"]["method"] == "GET"
-
-    # Test valid methods: POST
-    @api_tool(
-        path="/test_post",
-        name="Test POST Tool",
-        description="A test POST tool",
-        parameters={"type": "object"},
-        method="POST",
-    )
-    def test_function_post():
-        return {"result": "success"}
-
-    result_post = test_function_post()
-    assert result_post == {"result": "success"}
-    assert "/test_post" in ops._route_data
-    assert ops._route_data["/test_post"]["method"] == "POST"
-
-
-def test_api_tool_decorator_invalid_method():
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_api_tool_decorator_method_validation(method):
+    """Test that api_tool accepts the supported methods."""
+    path = f"/test_{method.lower()}"
+
+    wrapped = api_tool(
+        path=path,
+        name=f"Test {method} Tool",
+        description=f"A test {method} tool",
+        parameters=_PARAMS,
+        method=method,
+    )(_ok)
+
+    assert wrapped() == {"result": "success"}
+    assert ops._route_data[path]["method"] == method
+
+
+@pytest.mark.parametrize(
+    "method, shown",
+    [
+        ("PUT", "PUT"),
+        ("DELETE", "DELETE"),
+        ("get", "get"),
+        ("PATCH", "PATCH"),
+        ("OPTIONS", "OPTIONS"),
+        (123, "123"),
+    ],
+)
+def test_api_tool_decorator_invalid_method(method, shown):
     """Test that api_tool raises ValueError for invalid methods."""
-    # Reset global state
-    set_route_data({"dummy": {}})
-    set_op_type("test")
-    set_permissions_by_state(None)
-
-    # Test invalid method - should raise ValueError during decoration
-    with pytest.raises(
-        ValueError, match="Method must be either 'GET' or 'POST', got 'PUT'"
-    ):
-
-        @api_tool(
+    with pytest.raises(ValueError, match=_METHOD_ERROR) as excinfo:
+        api_tool(
             path="/test_invalid",
             name="Test Invalid Tool",
             description="A test tool with invalid method",
-            parameters={"type": "object"},
-            method="PUT",
+            parameters=_PARAMS,
+            method=method,
         )
-        def test_function_invalid():
-            return {"result": "success"}
 
-    # Test another invalid method
-    with pytest.raises(
-        ValueError, match="Method must be either 'GET' or 'POST', got 'DELETE'"
-    ):
-
-        @api_tool(
-            path="/test_invalid2",
-            name="Test Invalid Tool 2",
-            description="A test tool with invalid method",
-            parameters={"type": "object"},
-            method="DELETE",
-        )
-        def test_function_invalid2():
-            return {"result": "success"}
-
-    # Test lowercase method (should also be invalid)
-    with pytest.raises(
-        ValueError, match="Method must be either 'GET' or 'POST', got 'get'"
-    ):
-
-        @api_tool(
-            path="/test_invalid3",
-            name="Test Invalid Tool 3",
-            description="A test tool with lowercase method",
-            parameters={"type": "object"},
-            method="get",
-        )
-        def test_function_invalid3():
-            return {"result": "success"}
+    assert _METHOD_ERROR.search(str(excinfo.value)).group(1) == shown
@@ -2,118 +2,92 @@
 # Tests for api/ops_reqs.py
 # =============================================================================
 
-import os
-from unittest.mock import MagicMock, patch
+import json
+from unittest.mock import MagicMock
 
-from pycommon.api.ops_reqs import get_all_op, register_ops
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.get")
-def test_get_all_op_success(mock_get):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "data": ["op1", "op2"]}
-    mock_get.return_value = mock_response
-
-    result = get_all_op("test_token")
+import pytest
 
-    assert result == {"success": True, "data": ["op1", "op2"]}
+from pycommon.api.ops_reqs import get_all_op, register_ops
 
 
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.get")
-def test_get_all_op_success_elif_branch(mock_get):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "data": ["op3", "op4"]}
-    mock_get.return_value = mock_response
+@pytest.fixture(scope="module", autouse=True)
+def api_base_url():
+    """Point every test in this module at the same API base URL."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("API_BASE_URL", "http://test-api.com")
+        yield
+
+
+@pytest.fixture
+def mock_get(monkeypatch):
+    """Replace requests.get in ops_reqs with a MagicMock."""
+    mock = MagicMock()
+    monkeypatch.setattr("pycommon.api.ops_reqs.requests.get", mock)
+    return mock
+
+
+@pytest.fixture
+def mock_post(monkeypatch):
+    """Replace requests.post in ops_reqs with a MagicMock."""
+    mock = MagicMock()
+    monkeypatch.setattr("pycommon.api.ops_reqs.requests.post", mock)
+    return mock
+
+
+@pytest.mark.parametrize(
+    "status, payload, expected",
+    [
+        (
+            200,
+            {"success": True, "data": ["op1", "op2"]},
+            {"success": True, "data": ["op1", "op2"]},
+        ),
+        (
+            200,
+            {"success": True, "data": ["op3", "op4"]},
+            {"success": True, "data": ["op3", "op4"]},
+        ),
+        (400, {"success": False}, {"success": False, "data": None}),
+    ],
+    ids=["success", "success_other_data", "failure"],
+)
+def test_get_all_op(mock_get, make_resp, status, payload, expected):
+    mock_get.return_value = make_resp(status, payload)
 
     result = get_all_op("test_token")
 
-    assert result == {"success": True, "data": ["op3", "op4"]}
+    assert result == expected
 
 
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.get")
-def test_get_all_op_failure(mock_get):
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"success": False}
-    mock_get.return_value = mock_response
+def test_get_all_op_json_decode_error(mock_get, make_resp):
+    mock_get.return_value = make_resp(200, content=b"not json")
 
     result = get_all_op("test_token")
-
     assert result == {"success": False, "data": None}
 
 
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.post")
-def test_register_ops_success(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True}
-    mock_post.return_value = mock_response
+@pytest.mark.parametrize(
+    "status, payload, system_op, expected",
+    [
+        (200, {"success": True}, False, True),
+        (200, {"success": True}, True, True),
+        (400, {"success": False}, False, False),
+    ],
+    ids=["success", "success_system_op", "failure"],
+)
+def test_register_ops(mock_post, make_resp, status, payload, system_op, expected):
+    mock_post.return_value = make_resp(status, payload)
 
-    result = register_ops("test_token", [{"name": "test_op"}])
+    result = register_ops("test_token", [{"name": "test_op"}], system_op=system_op)
 
-    assert result is True
+    assert result is expected
+    sent = json.loads(mock_post.call_args.kwargs["data"])
+    assert sent["data"]["system_op"] is system_op
 
 
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.post")
-def test_register_ops_success_elif_branch(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True}
-    mock_post.return_value = mock_response
-
-    result = register_ops("test_token", [{"name": "test_op2"}], system_op=True)
-
-    assert result is True
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.post")
 def test_register_ops_exception_lines_64_70(mock_post):
     mock_post.side_effect = Exception("Network error")
 
     result = register_ops("test_token", [{"name": "test_op"}])
 
     assert result is False
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.get")
-def test_get_all_op_json_decode_error(mock_get):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.side_effect = ValueError("JSON decode error")
-    mock_get.return_value = mock_response
-
-    result = get_all_op("test_token")
-    assert result == {"success": False, "data": None}
-
-
-# Additional coverage tests for ops_reqs.py
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.post")
-def test_register_ops_exception_lines_64_70_new(mock_post):
-    mock_post.side_effect = Exception("Network error")
-
-    result = register_ops("test_token", [{"name": "test_op"}])
-
-    assert result is False
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ops_reqs.requests.post")
-def test_register_ops_failure(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"success": False}
-    mock_post.return_value = mock_response
-
-    result = register_ops("test_token", [{"name": "test_op"}])
-
-    assert result is False
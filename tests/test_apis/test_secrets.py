@@ -17,63 +17,58 @@ from pycommon.api.secrets import (
 )
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_get_secret_value_success(mock_boto3_client):
-    mock_client = MagicMock()
-    mock_client.get_secret_value.return_value = {"SecretString": "secret_value"}
-    mock_boto3_client.return_value = mock_client
-
-    result = get_secret_value("test_secret")
-
-    assert result == "secret_value"
-
-
-@patch("pycommon.api.secrets.boto3.client")
-def test_get_secret_value_success_binary(mock_boto3_client):
-    """Test successful retrieval of binary secret."""
-    mock_client = MagicMock()
-    # Simulate binary secret (encoded as bytes)
-    mock_client.get_secret_value.return_value = {"SecretBinary": b"binary_secret_value"}
-    mock_boto3_client.return_value = mock_client
-
-    result = get_secret_value("test_binary_secret")
-
-    assert result == "binary_secret_value"
+@pytest.fixture
+def boto_client(monkeypatch):
+    """MagicMock returned for every boto3.client() call made by secrets."""
+    client = MagicMock()
+    monkeypatch.setattr(
+        "pycommon.api.secrets.boto3.client", lambda *args, **kwargs: client
+    )
+    return client
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_get_secret_value_unexpected_format(mock_boto3_client):
-    """Test handling of unexpected secret format
-    (neither SecretString nor SecretBinary).
-    """
-    mock_client = MagicMock()
-    mock_client.get_secret_value.return_value = {"SomeOtherField": "value"}
-    mock_boto3_client.return_value = mock_client
+@pytest.mark.parametrize(
+    "field, stored, expected",
+    [
+        ("SecretString", "secret_value", "secret_value"),
+        ("SecretBinary", b"binary_secret_value", "binary_secret_value"),
+    ],
+    ids=["string", "binary"],
+)
+def test_get_secret_value_success(boto_client, field, stored, expected):
+    boto_client.get_secret_value.return_value = {field: stored}
 
-    with pytest.raises(ValueError, match="Unexpected secret format for 'test_secret'"):
-        get_secret_value("test_secret")
+    result = get_secret_value("test_secret")
 
+    assert result == expected
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_get_secret_value_failure(mock_boto3_client):
-    mock_client = MagicMock()
-    mock_client.get_secret_value.side_effect = Exception("Secret not found")
-    mock_boto3_client.return_value = mock_client
 
-    with pytest.raises(ValueError, match="Failed to retrieve secret"):
+@pytest.mark.parametrize(
+    "outcome, message",
+    [
+        ({"SomeOtherField": "value"}, "Unexpected secret format for 'test_secret'"),
+        (Exception("Secret not found"), "Failed to retrieve secret"),
+    ],
+    ids=["unexpected_format", "failure"],
+)
+def test_get_secret_value_errors(boto_client, outcome, message):
+    """Test unexpected secret formats and client failures raise ValueError."""
+    if isinstance(outcome, Exception):
+        boto_client.get_secret_value.side_effect = outcome
+    else:
+        boto_client.get_secret_value.return_value = outcome
+
+    with pytest.raises(ValueError, match=message):
         get_secret_value("test_secret")
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_store_secret_parameter_success(mock_boto3_client):
-    mock_client = MagicMock()
-    mock_client.put_parameter.return_value = {"Version": 1}
-    mock_boto3_client.return_value = mock_client
+def test_store_secret_parameter_success(boto_client):
+    boto_client.put_parameter.return_value = {"Version": 1}
 
     result = store_secret_parameter("test_param", "secret_value")
 
     assert result == {"Version": 1}
-    mock_client.put_parameter.assert_called_once_with(
+    boto_client.put_parameter.assert_called_once_with(
         Name="/test_param",
         Value="secret_value",
         Type="SecureString",
@@ -81,37 +76,28 @@ def test_store_secret_parameter_success(mock_boto3_client):
     )
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_store_secret_parameter_failure(mock_boto3_client):
-    mock_client = MagicMock()
-    mock_client.put_parameter.side_effect = ClientError(
+def test_store_secret_parameter_failure(boto_client):
+    boto_client.put_parameter.side_effect = ClientError(
         {"Error": {"Code": "ParameterLimitExceeded"}}, "PutParameter"
     )
-    mock_boto3_client.return_value = mock_client
 
     result = store_secret_parameter("test_param", "secret_value")
 
     assert result is None
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_get_secret_parameter_success(mock_boto3_client):
-    mock_client = MagicMock()
-    mock_client.get_parameter.return_value = {"Parameter": {"Value": "secret_value"}}
-    mock_boto3_client.return_value = mock_client
+def test_get_secret_parameter_success(boto_client):
+    boto_client.get_parameter.return_value = {"Parameter": {"Value": "secret_value"}}
 
     result = get_secret_parameter("test_param")
 
     assert result == "secret_value"
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_get_secret_parameter_failure(mock_boto3_client):
-    mock_client = MagicMock()
-    mock_client.get_parameter.side_effect = ClientError(
+def test_get_secret_parameter_failure(boto_client):
+    boto_client.get_parameter.side_effect = ClientError(
         {"Error": {"Code": "ParameterNotFound"}}, "GetParameter"
     )
-    mock_boto3_client.return_value = mock_client
 
     result = get_secret_parameter("test_param")
 
@@ -171,57 +157,36 @@ def test_store_secrets_in_dict_parameter_name_empty(mock_uuid, mock_store_secret
     mock_store_secret.assert_called_once_with("", "secret_value")
 
 
-@patch("pycommon.api.secrets.boto3.client")
-def test_delete_secret_parameter_success(mock_boto3_client):
-    """Test successful deletion of a secret parameter."""
-    mock_client = MagicMock()
-    mock_client.delete_parameter.return_value = None
-    mock_boto3_client.return_value = mock_client
-
-    result = delete_secret_parameter("test_param")
-
-    assert result is True
-    mock_client.delete_parameter.assert_called_once_with(Name="/test_param")
-
-
-@patch("pycommon.api.secrets.boto3.client")
-def test_delete_secret_parameter_success_custom_prefix(mock_boto3_client):
-    """Test successful deletion with custom prefix."""
-    mock_client = MagicMock()
-    mock_client.delete_parameter.return_value = None
-    mock_boto3_client.return_value = mock_client
-
-    result = delete_secret_parameter("test_param", prefix="/custom")
-
-    assert result is True
-    mock_client.delete_parameter.assert_called_once_with(Name="/custom/test_param")
-
-
-@patch("pycommon.api.secrets.boto3.client")
-def test_delete_secret_parameter_failure(mock_boto3_client):
-    """Test deletion failure when parameter doesn't exist."""
-    mock_client = MagicMock()
-    mock_client.delete_parameter.side_effect = ClientError(
-        {"Error": {"Code": "ParameterNotFound"}}, "DeleteParameter"
-    )
-    mock_boto3_client.return_value = mock_client
-
-    result = delete_secret_parameter("nonexistent_param")
-
-    assert result is False
-    mock_client.delete_parameter.assert_called_once_with(Name="/nonexistent_param")
-
-
-@patch("pycommon.api.secrets.boto3.client")
-def test_delete_secret_parameter_access_denied(mock_boto3_client):
-    """Test deletion failure due to access denied."""
-    mock_client = MagicMock()
-    mock_client.delete_parameter.side_effect = ClientError(
-        {"Error": {"Code": "AccessDenied"}}, "DeleteParameter"
-    )
-    mock_boto3_client.return_value = mock_client
+@pytest.mark.parametrize(
+    "name, prefix, side_effect, expected_name, expected",
+    [
+        ("test_param", None, None, "/test_param", True),
+        ("test_param", "/custom", None, "/custom/test_param", True),
+        (
+            "nonexistent_param",
+            None,
+            ClientError({"Error": {"Code": "ParameterNotFound"}}, "DeleteParameter"),
+            "/nonexistent_param",
+            False,
+        ),
+        (
+            "test_param",
+            None,
+            ClientError({"Error": {"Code": "AccessDenied"}}, "DeleteParameter"),
+            "/test_param",
+            False,
+        ),
+    ],
+    ids=["success", "custom_prefix", "not_found", "access_denied"],
+)
+def test_delete_secret_parameter(
+    boto_client, name, prefix, side_effect, expected_name, expected
+):
+    """Test deleting a secret parameter with default and custom prefixes."""
+    boto_client.delete_parameter.side_effect = side_effect
+    kwargs = {} if prefix is None else {"prefix": prefix}
 
-    result = delete_secret_parameter("test_param")
+    result = delete_secret_parameter(name, **kwargs)
 
-    assert result is False
-    mock_client.delete_parameter.assert_called_once_with(Name="/test_param")
+    assert result is expected
+    boto_client.delete_parameter.assert_called_once_with(Name=expected_name)
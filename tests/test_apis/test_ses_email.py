@@ -2,56 +2,97 @@
 # Tests for api/ses_email.py
 # =============================================================================
 
-import os
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import Mock
 
-from pycommon.api.ses_email import send_email
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ses_email.requests.post")
-def test_send_email_success(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True}
-    mock_post.return_value = mock_response
-
-    result = send_email("test_token", "test@example.com", "Subject", "Body")
-
-    assert result is True
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ses_email.requests.post")
-def test_send_email_success_elif_branch(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True}
-    mock_post.return_value = mock_response
-
-    result = send_email("test_token", "user@example.com", "Test Subject", "Test Body")
+import pytest
+import requests
 
-    assert result is True
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ses_email.requests.post")
-def test_send_email_failure(mock_post):
-    mock_response = MagicMock()
-    mock_response.status_code = 400
-    mock_response.json.return_value = {"success": False}
-    mock_post.return_value = mock_response
-
-    result = send_email("test_token", "test@example.com", "Subject", "Body")
-
-    assert result is False
-
-
-@patch.dict(os.environ, {"API_BASE_URL": "http://test-api.com"})
-@patch("pycommon.api.ses_email.requests.post")
-def test_send_email_exception(mock_post):
-    mock_post.side_effect = Exception("Network error")
+from pycommon.api.ses_email import send_email
 
-    result = send_email("test_token", "test@example.com", "Subject", "Body")
 
-    assert result is False
+def _ok():
+    pass
+
+
+def _client_error():
+    raise requests.HTTPError("400 Client Error")
+
+
+def _not_json():
+    raise ValueError("Expecting value")
+
+
+# Shared read-only responses from the SES endpoint
+_OK = SimpleNamespace(
+    status_code=200,
+    content=b'{"success": true}',
+    json=lambda: {"success": True},
+    raise_for_status=_ok,
+)
+_NOT_SENT = SimpleNamespace(
+    status_code=200,
+    content=b'{"success": false}',
+    json=lambda: {"success": False},
+    raise_for_status=_ok,
+)
+_BAD = SimpleNamespace(
+    status_code=400,
+    content=b'{"success": false}',
+    json=lambda: {"success": False},
+    raise_for_status=_client_error,
+)
+_INVALID = SimpleNamespace(
+    status_code=200, content=b"<html>", json=_not_json, raise_for_status=_ok
+)
+_NOT_OBJECT = SimpleNamespace(
+    status_code=200, content=b"[]", json=lambda: [], raise_for_status=_ok
+)
+
+
+@pytest.fixture(autouse=True)
+def mock_post(monkeypatch):
+    """Patch requests.post in ses_email and point it at a test API URL."""
+    mock = Mock()
+    monkeypatch.setattr("pycommon.api.ses_email.requests.post", mock)
+    monkeypatch.setenv("API_BASE_URL", "http://test-api.com")
+    return mock
+
+
+@pytest.mark.parametrize(
+    "email, response, side_effect, expected",
+    [
+        ("test@example.com", _OK, None, True),
+        ("user@example.com", _OK, None, True),
+        ("test@example.com", _NOT_SENT, None, False),
+        ("test@example.com", _BAD, None, False),
+        ("test@example.com", _INVALID, None, False),
+        ("test@example.com", _NOT_OBJECT, None, False),
+        ("test@example.com", None, requests.ConnectionError("Network error"), False),
+    ],
+    ids=[
+        "success",
+        "success_other_recipient",
+        "not_sent",
+        "http_error",
+        "invalid_json",
+        "not_an_object",
+        "connection_error",
+    ],
+)
+def test_send_email(mock_post, email, response, side_effect, expected):
+    if side_effect is not None:
+        mock_post.side_effect = side_effect
+    else:
+        mock_post.return_value = response
+
+    result = send_email("test_token", email, "Subject", "Body")
+
+    assert result is expected
+
+
+def test_send_email_unexpected_error_propagates(mock_post):
+    mock_post.side_effect = RuntimeError("bug")
+
+    with pytest.raises(RuntimeError, match="bug"):
+        send_email("test_token", "test@example.com", "Subject", "Body")
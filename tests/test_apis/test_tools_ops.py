@@ -2,10 +2,12 @@
 # Tests for api/tools_ops.py
 # =============================================================================
 
-import os
-import tempfile
-from unittest.mock import call, patch
+import logging
+from unittest.mock import Mock, call, mock_open, patch
 
+import pytest
+
+from pycommon.api import tools_ops
 from pycommon.api.tools_ops import (
     _scan_lambda_codebase,
     api_tools_register_handler,
@@ -15,6 +17,48 @@ from pycommon.api.tools_ops import (
 from pycommon.tools.ops import OperationModel
 
 
+@pytest.fixture(autouse=True)
+def empty_python_files_cache(monkeypatch):
+    """Start every test without cached directory walks."""
+    monkeypatch.setattr(tools_ops, "_task_root_files", None)
+
+
+@pytest.fixture
+def debug_log(caplog):
+    """caplog capturing the tools_ops debug log."""
+    caplog.set_level(logging.DEBUG, logger="pycommon.api.tools_ops")
+    return caplog
+
+
+@pytest.fixture(scope="module")
+def sample_op():
+    """Operation returned by the mocked codebase scans."""
+    return OperationModel(
+        description="Test operation",
+        id="test_op",
+        includeAccessToken=True,
+        method="POST",
+        name="Test Operation",
+        type="built_in",
+        url="/test",
+        tags=["test"],
+    )
+
+
+@pytest.fixture
+def mock_scan(monkeypatch):
+    """Replace _scan_lambda_codebase with a Mock."""
+    mock = Mock()
+    monkeypatch.setattr("pycommon.api.tools_ops._scan_lambda_codebase", mock)
+    return mock
+
+
+@pytest.fixture
+def ops_table_env(monkeypatch):
+    """Configure the DynamoDB table register_lambda_ops writes to."""
+    monkeypatch.setenv("OPS_DYNAMODB_TABLE", "test-table")
+
+
 class TestApiToolsRegisterHandler:
     """Test cases for the api_tools_register_handler function."""
 
@@ -92,185 +136,137 @@ class TestApiToolsRegisterHandler:
             mock_list.assert_called_once_with([])
             assert result["success"] is True
 
-    def test_api_tools_register_handler_prints_debug_info(self, capsys):
-        """Test that handler prints appropriate debug information."""
+    def test_api_tools_register_handler_logs_debug_info(self, debug_log):
+        """Test that handler logs appropriate debug information."""
         with patch("pycommon.api.tools_ops.list_lambda_ops") as mock_list:
             mock_list.return_value = {"success": True, "operations_count": 0}
 
             api_tools_register_handler(command="ls")
-            captured = capsys.readouterr()
 
-            assert "Listing operations" in captured.out
+            assert "Listing operations" in debug_log.text
 
         with patch("pycommon.api.tools_ops.register_lambda_ops") as mock_register:
             mock_register.return_value = {"success": True, "operations_count": 0}
 
             api_tools_register_handler(command="register")
-            captured = capsys.readouterr()
 
-            assert "Registering operations" in captured.out
+            assert "Registering operations" in debug_log.text
 
 
 class TestRegisterLambdaOps:
     """Test cases for the register_lambda_ops function."""
 
-    def test_register_lambda_ops_no_table_env_var(self):
+    def test_register_lambda_ops_no_table_env_var(self, monkeypatch):
         """Test register when OPS_DYNAMODB_TABLE is not set."""
-        with patch.dict(os.environ, {}, clear=True):
-            result = register_lambda_ops(["service"])
+        monkeypatch.delenv("OPS_DYNAMODB_TABLE", raising=False)
 
-            assert result["success"] is False
-            assert "OPS_DYNAMODB_TABLE environment variable not set" in result["error"]
-            assert result["operations_count"] == 0
+        result = register_lambda_ops(["service"])
+
+        assert result["success"] is False
+        assert "OPS_DYNAMODB_TABLE environment variable not set" in result["error"]
+        assert result["operations_count"] == 0
 
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
     @patch("pycommon.api.tools_ops.write_ops")
-    def test_register_lambda_ops_success(self, mock_write_ops, mock_scan, capsys):
+    def test_register_lambda_ops_success(
+        self, mock_write_ops, mock_scan, ops_table_env, sample_op
+    ):
         """Test successful registration of operations."""
-        # Mock environment variable
-        with patch.dict(os.environ, {"OPS_DYNAMODB_TABLE": "test-table"}):
-            # Mock operations
-            mock_op = OperationModel(
-                description="Test operation",
-                id="test_op",
-                includeAccessToken=True,
-                method="POST",
-                name="Test Operation",
-                type="built_in",
-                url="/test",
-                tags=["test"],
-            )
-            mock_scan.return_value = [mock_op]
-            mock_write_ops.return_value = {"success": True}
-
-            result = register_lambda_ops(
-                include_dirs=["service"],
-                data={"additional_tags": ["custom"]},
-                current_user="test_user",
-            )
+        # Mock operations
+        mock_scan.return_value = [sample_op]
+        mock_write_ops.return_value = {"success": True}
 
-            assert result["success"] is True
-            assert result["operations_count"] == 1
-            assert "Successfully registered 1 operations" in result["message"]
-            assert len(result["operations"]) == 1
-            assert result["operations"][0]["name"] == "Test Operation"
+        result = register_lambda_ops(
+            include_dirs=["service"],
+            data={"additional_tags": ["custom"]},
+            current_user="test_user",
+        )
 
-            # Verify write_ops was called with correct parameters
-            mock_write_ops.assert_called_once_with(
-                current_user="test_user", tags=["all", "custom"], ops=[mock_op]
-            )
+        assert result["success"] is True
+        assert result["operations_count"] == 1
+        assert "Successfully registered 1 operations" in result["message"]
+        assert len(result["operations"]) == 1
+        assert result["operations"][0]["name"] == "Test Operation"
 
-            # Check debug output
-            captured = capsys.readouterr()
-            assert "Register: Using DynamoDB table: test-table" in captured.out
-            assert "Register: About to register 1 operations" in captured.out
+        # Verify write_ops was called with correct parameters
+        mock_write_ops.assert_called_once_with(
+            current_user="test_user", tags=["all", "custom"], ops=[sample_op]
+        )
 
-    @patch("os.path.exists")
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
     @patch("pycommon.api.tools_ops.write_ops")
     def test_register_lambda_ops_success_var_task_exists(
-        self, mock_write_ops, mock_scan, mock_exists, capsys
+        self, mock_write_ops, mock_scan, ops_table_env, sample_op, monkeypatch
     ):
         """Test successful registration when /var/task directory exists."""
-        # Mock environment variable
-        with patch.dict(os.environ, {"OPS_DYNAMODB_TABLE": "test-table"}):
-            mock_exists.return_value = True  # /var/task exists
-            mock_op = OperationModel(
-                description="Test operation",
-                id="test_op",
-                includeAccessToken=True,
-                method="POST",
-                name="Test Operation",
-                type="built_in",
-                url="/test",
-                tags=["test"],
-            )
-            mock_scan.return_value = [mock_op]
-            mock_write_ops.return_value = {"success": True}
-
-            result = register_lambda_ops(["service"])
+        monkeypatch.setattr(tools_ops, "_SCAN_ROOT", "/var/task")
+        mock_scan.return_value = [sample_op]
+        mock_write_ops.return_value = {"success": True}
 
-            assert result["success"] is True
-            assert result["operations_count"] == 1
+        result = register_lambda_ops(["service"])
 
-            # Verify scan was called with /var/task (no fallback)
-            mock_scan.assert_called_once_with("/var/task", ["service"])
+        assert result["success"] is True
+        assert result["operations_count"] == 1
 
-            # Check that no fallback message appears
-            captured = capsys.readouterr()
-            assert "Register: Directory /var/task does not exist!" not in captured.out
-            assert "Register: Using current working directory:" not in captured.out
+        # Verify scan was called with /var/task (no fallback)
+        mock_scan.assert_called_once_with("/var/task", ["service"])
 
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
-    def test_register_lambda_ops_no_operations_found(self, mock_scan):
+    def test_register_lambda_ops_no_operations_found(self, mock_scan, ops_table_env):
         """Test register when no operations are found."""
-        with patch.dict(os.environ, {"OPS_DYNAMODB_TABLE": "test-table"}):
-            mock_scan.return_value = []
+        mock_scan.return_value = []
 
-            result = register_lambda_ops(["service"])
+        result = register_lambda_ops(["service"])
 
-            assert result["success"] is True
-            assert result["operations_count"] == 0
-            assert result["message"] == "No operations found"
-            assert result["operations"] == []
+        assert result["success"] is True
+        assert result["operations_count"] == 0
+        assert result["message"] == "No operations found"
+        assert result["operations"] == []
 
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
-    def test_register_lambda_ops_exception(self, mock_scan, capsys):
+    def test_register_lambda_ops_exception(self, mock_scan, debug_log, ops_table_env):
         """Test register when an exception occurs."""
-        with patch.dict(os.environ, {"OPS_DYNAMODB_TABLE": "test-table"}):
-            mock_scan.side_effect = Exception("Scan error")
+        mock_scan.side_effect = Exception("Scan error")
 
-            result = register_lambda_ops(["service"])
+        result = register_lambda_ops(["service"])
 
-            assert result["success"] is False
-            assert "Registration failed: Scan error" in result["error"]
-            assert result["operations_count"] == 0
+        assert result["success"] is False
+        assert "Registration failed: Scan error" in result["error"]
+        assert result["operations_count"] == 0
 
-            # Check error was logged
-            captured = capsys.readouterr()
-            assert "Register: Error occurred: Scan error" in captured.out
+        # Check error was logged
+        assert "Register: Error occurred: Scan error" in debug_log.text
 
-    @patch("os.path.exists")
-    @patch("os.getcwd")
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
     def test_register_lambda_ops_fallback_directory(
-        self, mock_scan, mock_getcwd, mock_exists, capsys
+        self, mock_scan, debug_log, ops_table_env, monkeypatch
     ):
         """Test register falls back to current directory
         when /var/task doesn't exist."""
-        with patch.dict(os.environ, {"OPS_DYNAMODB_TABLE": "test-table"}):
-            mock_exists.return_value = False
-            mock_getcwd.return_value = "/current/dir"
-            mock_scan.return_value = []
-
-            result = register_lambda_ops(["service"])
-
-            # Check fallback logic was used
-            captured = capsys.readouterr()
-            assert "Register: Directory /var/task does not exist!" in captured.out
-            assert (
-                "Register: Using current working directory: /current/dir"
-                in captured.out
-            )
+        monkeypatch.setattr(tools_ops, "_SCAN_ROOT", "/current/dir")
+        mock_scan.return_value = []
 
-            # Verify scan was called with fallback directory
-            mock_scan.assert_called_once_with("/current/dir", ["service"])
-            assert result["success"] is True
+        result = register_lambda_ops(["service"])
+
+        # Check fallback logic was used
+        assert "Register: Directory /var/task does not exist!" in debug_log.text
+        assert (
+            "Register: Using current working directory: /current/dir" in debug_log.text
+        )
 
-    def test_register_lambda_ops_default_data(self):
+        # Verify scan was called with fallback directory
+        mock_scan.assert_called_once_with("/current/dir", ["service"])
+        assert result["success"] is True
+
+    def test_register_lambda_ops_default_data(self, monkeypatch):
         """Test register with default data parameter."""
-        with patch.dict(os.environ, {}, clear=True):
-            result = register_lambda_ops(["service"])
+        monkeypatch.delenv("OPS_DYNAMODB_TABLE", raising=False)
 
-            # Should handle None data gracefully
-            assert result["success"] is False  # Due to missing env var
+        result = register_lambda_ops(["service"])
+
+        # Should handle None data gracefully
+        assert result["success"] is False  # Due to missing env var
 
 
 class TestListLambdaOps:
     """Test cases for the list_lambda_ops function."""
 
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
-    def test_list_lambda_ops_success(self, mock_scan, capsys):
+    def test_list_lambda_ops_success(self, mock_scan):
         """Test successful listing of operations."""
         # Mock operations
         mock_op = OperationModel(
@@ -307,17 +303,9 @@ class TestListLambdaOps:
         assert op_info["output"] == {"type": "string"}
         assert op_info["permissions"] == {"read": True}
 
-        # Check debug output
-        captured = capsys.readouterr()
-        assert "Scanning directory: /var/task" in captured.out
-        assert "Including directories: ['service']" in captured.out
-
-    @patch("os.path.exists")
-    @patch("os.getcwd")
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
-    def test_list_lambda_ops_no_operations(self, mock_scan, mock_getcwd, mock_exists):
+    def test_list_lambda_ops_no_operations(self, mock_scan, monkeypatch):
         """Test listing when no operations are found."""
-        mock_exists.return_value = True  # Make /var/task exist
+        monkeypatch.setattr(tools_ops, "_SCAN_ROOT", "/var/task")
         mock_scan.return_value = []
 
         result = list_lambda_ops(["service"])
@@ -330,20 +318,11 @@ class TestListLambdaOps:
         assert result["debug_info"]["scanned_directory"] == "/var/task"
         assert result["debug_info"]["included_dirs"] == ["service"]
 
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
-    def test_list_lambda_ops_operation_without_optional_fields(self, mock_scan):
+    def test_list_lambda_ops_operation_without_optional_fields(
+        self, mock_scan, sample_op
+    ):
         """Test listing operation without optional fields."""
-        mock_op = OperationModel(
-            description="Test operation",
-            id="test_op",
-            includeAccessToken=True,
-            method="POST",
-            name="Test Operation",
-            type="built_in",
-            url="/test",
-            tags=["test"],
-        )
-        mock_scan.return_value = [mock_op]
+        mock_scan.return_value = [sample_op]
 
         result = list_lambda_ops(["service"])
 
@@ -353,8 +332,7 @@ class TestListLambdaOps:
         assert "permissions" not in op_info
         assert result["success"] is True
 
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
-    def test_list_lambda_ops_exception(self, mock_scan, capsys):
+    def test_list_lambda_ops_exception(self, mock_scan, debug_log):
         """Test listing when an exception occurs."""
         mock_scan.side_effect = Exception("Scan error")
 
@@ -365,26 +343,20 @@ class TestListLambdaOps:
         assert result["operations_count"] == 0
 
         # Check error was logged
-        captured = capsys.readouterr()
-        assert "Error in list_lambda_ops: Scan error" in captured.out
+        assert "Error in list_lambda_ops: Scan error" in debug_log.text
 
-    @patch("os.path.exists")
-    @patch("os.getcwd")
-    @patch("pycommon.api.tools_ops._scan_lambda_codebase")
     def test_list_lambda_ops_fallback_directory(
-        self, mock_scan, mock_getcwd, mock_exists, capsys
+        self, mock_scan, debug_log, monkeypatch
     ):
         """Test listing falls back to current directory when /var/task doesn't exist."""
-        mock_exists.return_value = False
-        mock_getcwd.return_value = "/current/dir"
+        monkeypatch.setattr(tools_ops, "_SCAN_ROOT", "/current/dir")
         mock_scan.return_value = []
 
         result = list_lambda_ops(["service"])
 
         # Check fallback logic was used
-        captured = capsys.readouterr()
-        assert "Directory /var/task does not exist!" in captured.out
-        assert "Using current working directory: /current/dir" in captured.out
+        assert "Directory /var/task does not exist!" in debug_log.text
+        assert "Using current working directory: /current/dir" in debug_log.text
 
         # Verify scan was called with fallback directory
         mock_scan.assert_called_once_with("/current/dir", ["service"])
@@ -398,7 +370,7 @@ class TestScanLambdaCodebase:
     @patch("pycommon.api.tools_ops.extract_ops_from_file")
     @patch("pycommon.api.tools_ops.print_pretty_ops")
     def test_scan_lambda_codebase_success(
-        self, mock_print_pretty, mock_extract, mock_find_files, capsys
+        self, mock_print_pretty, mock_extract, mock_find_files, debug_log, sample_op
     ):
         """Test successful scanning of lambda codebase."""
         # Mock file discovery
@@ -409,18 +381,8 @@ class TestScanLambdaCodebase:
         ]
 
         # Mock operation extraction
-        mock_op = OperationModel(
-            description="Test operation",
-            id="test_op",
-            includeAccessToken=True,
-            method="POST",
-            name="Test Operation",
-            type="built_in",
-            url="/test",
-            tags=["test"],
-        )
         mock_extract.side_effect = [
-            [mock_op],  # service/handler.py
+            [sample_op],  # service/handler.py
             [],  # service/utils.py
             [],  # other/file.py (excluded)
         ]
@@ -437,19 +399,18 @@ class TestScanLambdaCodebase:
         )
 
         # Check debug output
-        captured = capsys.readouterr()
-        assert "Starting scan of directory: /var/task" in captured.out
-        assert "Found 3 Python files total" in captured.out
-        assert "Including file: /var/task/service/handler.py" in captured.out
-        assert "Including file: /var/task/service/utils.py" in captured.out
-        assert "After filtering, scanning 2 files for operations" in captured.out
-        assert "Found 1 operations in /var/task/service/handler.py" in captured.out
-        assert "Total operations found: 1" in captured.out
+        assert "Starting scan of directory: /var/task" in debug_log.text
+        assert "Found 3 Python files total" in debug_log.text
+        assert "Including file: /var/task/service/handler.py" in debug_log.text
+        assert "Including file: /var/task/service/utils.py" in debug_log.text
+        assert "After filtering, scanning 2 files for operations" in debug_log.text
+        assert "Found 1 operations in /var/task/service/handler.py" in debug_log.text
+        assert "Total operations found: 1" in debug_log.text
 
     @patch("pycommon.api.tools_ops.find_python_files")
     @patch("pycommon.api.tools_ops.extract_ops_from_file")
     def test_scan_lambda_codebase_extraction_error(
-        self, mock_extract, mock_find_files, capsys
+        self, mock_extract, mock_find_files, debug_log, sample_op
     ):
         """Test scanning when extraction fails for some files."""
         mock_find_files.return_value = [
@@ -457,19 +418,8 @@ class TestScanLambdaCodebase:
             "/var/task/service/bad.py",
         ]
 
-        mock_op = OperationModel(
-            description="Test operation",
-            id="test_op",
-            includeAccessToken=True,
-            method="POST",
-            name="Test Operation",
-            type="built_in",
-            url="/test",
-            tags=["test"],
-        )
-
         # First file succeeds, second fails
-        mock_extract.side_effect = [[mock_op], Exception("Parse error")]
+        mock_extract.side_effect = [[sample_op], Exception("Parse error")]
 
         result = _scan_lambda_codebase("/var/task", ["service"])
 
@@ -478,14 +428,10 @@ class TestScanLambdaCodebase:
         assert result[0].name == "Test Operation"
 
         # Check warning was logged
-        captured = capsys.readouterr()
-        assert (
-            "Warning: Could not parse /var/task/service/bad.py: Parse error"
-            in captured.out
-        )
+        assert "Could not parse /var/task/service/bad.py: Parse error" in debug_log.text
 
     @patch("pycommon.api.tools_ops.find_python_files")
-    def test_scan_lambda_codebase_no_matching_files(self, mock_find_files, capsys):
+    def test_scan_lambda_codebase_no_matching_files(self, mock_find_files, debug_log):
         """Test scanning when no files match include directories."""
         mock_find_files.return_value = [
             "/var/task/other/file.py",
@@ -497,9 +443,23 @@ class TestScanLambdaCodebase:
         assert len(result) == 0
 
         # Check debug output
-        captured = capsys.readouterr()
-        assert "After filtering, scanning 0 files for operations" in captured.out
-        assert "Total operations found: 0" in captured.out
+        assert "After filtering, scanning 0 files for operations" in debug_log.text
+        assert "Total operations found: 0" in debug_log.text
+
+    @patch("pycommon.api.tools_ops.find_python_files")
+    def test_scan_lambda_codebase_include_dirs_are_literal(self, mock_find_files):
+        """Test that include directory names are matched literally, not as regex."""
+        mock_find_files.return_value = [
+            "/var/task/a.b/handler.py",  # Should be included
+            "/var/task/axb/handler.py",  # Should NOT be included
+        ]
+
+        with patch("pycommon.api.tools_ops.extract_ops_from_file") as mock_extract:
+            mock_extract.return_value = []
+
+            _scan_lambda_codebase("/var/task", ["a.b"])
+
+            mock_extract.assert_called_once_with("/var/task/a.b/handler.py")
 
     @patch("pycommon.api.tools_ops.find_python_files")
     def test_scan_lambda_codebase_include_patterns(self, mock_find_files):
@@ -519,17 +479,16 @@ class TestScanLambdaCodebase:
 
             # Should process 3 files: service dir files and file ending with service
             assert mock_extract.call_count == 3
-            expected_files = [
+            actual = {c.args[0] for c in mock_extract.call_args_list}
+            assert actual == {
                 "/var/task/service/handler.py",
                 "/var/task/service/subdir/file.py",
                 "/var/task/other/service",
-            ]
-            for expected_file in expected_files:
-                mock_extract.assert_any_call(expected_file)
+            }
 
     @patch("pycommon.api.tools_ops.find_python_files")
     def test_scan_lambda_codebase_empty_include_dirs_uses_exclusion(
-        self, mock_find_files, capsys
+        self, mock_find_files, debug_log
     ):
         """Test that empty include_dirs uses exclusion-based filtering."""
         mock_find_files.return_value = [
@@ -548,34 +507,33 @@ class TestScanLambdaCodebase:
 
             # Should process only non-excluded files
             assert mock_extract.call_count == 2
-            mock_extract.assert_any_call("/var/task/root_file.py")
-            mock_extract.assert_any_call("/var/task/service/handler.py")
+            actual = {c.args[0] for c in mock_extract.call_args_list}
+            assert actual == {
+                "/var/task/root_file.py",
+                "/var/task/service/handler.py",
+            }
 
             # Should NOT process excluded files
-            excluded_calls = [
-                "/var/task/schemata/schema.py",
-                "/var/task/node_modules/lib.py",
-                "/var/task/tests/test_file.py",
-                "/var/task/__pycache__/cache.py",
-            ]
-            for excluded_file in excluded_calls:
-                assert call(excluded_file) not in mock_extract.call_args_list
+            assert actual.isdisjoint(
+                {
+                    "/var/task/schemata/schema.py",
+                    "/var/task/node_modules/lib.py",
+                    "/var/task/tests/test_file.py",
+                    "/var/task/__pycache__/cache.py",
+                }
+            )
 
             # Check debug output
-            captured = capsys.readouterr()
-            assert "Using exclusion-based filtering" in captured.out
+            assert "Using exclusion-based filtering" in debug_log.text
 
     def test_scan_lambda_codebase_integration_with_real_files(self):
-        """Integration test with real temporary files."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create service directory with operation
-            service_dir = os.path.join(temp_dir, "service")
-            os.makedirs(service_dir)
-
-            handler_file = os.path.join(service_dir, "handler.py")
-            with open(handler_file, "w") as f:
-                f.write(
-                    """
+        """Integration test through the real file discovery and AST parsing.
+
+        The directory tree and file contents are served from memory, so the
+        test does no disk I/O.
+        """
+        sources = {
+            "/var/task/service/handler.py": """
 from pycommon.api.ops import api_tool
 
 @api_tool(
@@ -585,17 +543,9 @@ from pycommon.api.ops import api_tool
 )
 def test_function():
     return "success"
-"""
-                )
-
-            # Create other directory that should be excluded
-            other_dir = os.path.join(temp_dir, "other")
-            os.makedirs(other_dir)
-
-            other_file = os.path.join(other_dir, "excluded.py")
-            with open(other_file, "w") as f:
-                f.write(
-                    """
+""",
+            # In a directory that should be excluded
+            "/var/task/other/excluded.py": """
 from pycommon.api.ops import api_tool
 
 @api_tool(
@@ -605,12 +555,51 @@ from pycommon.api.ops import api_tool
 )
 def excluded_function():
     return "excluded"
-"""
-                )
+""",
+        }
+        tree = [
+            ("/var/task", ["service", "other"], []),
+            ("/var/task/service", [], ["handler.py"]),
+            ("/var/task/other", [], ["excluded.py"]),
+        ]
+
+        def fake_open(path, mode="r"):
+            return mock_open(read_data=sources[path])()
+
+        with patch("pycommon.tools.ops.os.walk", return_value=tree), patch(
+            "pycommon.tools.ops.open", side_effect=fake_open, create=True
+        ) as mock_file:
+            result = _scan_lambda_codebase("/var/task", ["service"])
+
+        # Should only find the operation in service directory
+        assert len(result) == 1
+        assert result[0].name == "Test Operation"
+        assert result[0].url == "/test"
+        mock_file.assert_called_once_with("/var/task/service/handler.py", "r")
+
 
-            result = _scan_lambda_codebase(temp_dir, ["service"])
+class TestFindPythonFilesCached:
+    """Test cases for the _find_python_files_cached helper."""
 
-            # Should only find the operation in service directory
-            assert len(result) == 1
-            assert result[0].name == "Test Operation"
-            assert result[0].url == "/test"
+    @patch("pycommon.api.tools_ops.find_python_files")
+    def test_walks_task_root_once(self, mock_find_files):
+        mock_find_files.return_value = ["/var/task/service/handler.py"]
+
+        first = tools_ops._find_python_files_cached("/var/task")
+        first.append("/var/task/mutated.py")
+        second = tools_ops._find_python_files_cached("/var/task")
+
+        assert second == ["/var/task/service/handler.py"]
+        assert second is not first
+        mock_find_files.assert_called_once_with("/var/task")
+
+    @patch("pycommon.api.tools_ops.find_python_files")
+    def test_walks_other_roots_every_time(self, mock_find_files):
+        mock_find_files.side_effect = [["/code/a.py"], ["/code/a.py", "/code/b.py"]]
+
+        assert tools_ops._find_python_files_cached("/code") == ["/code/a.py"]
+        assert tools_ops._find_python_files_cached("/code") == [
+            "/code/a.py",
+            "/code/b.py",
+        ]
+        assert tools_ops._task_root_files is None
@@ -1,16 +1,40 @@
-import json
+import logging
 import os
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
-from pycommon.api.user_data import load_user_data
+from pycommon.api._http import DEFAULT_TIMEOUT
+from pycommon.api.user_data import load_user_data, load_user_data_bulk
+
+# Request bodies load_user_data is expected to send, as compact JSON bytes
+_EXPECTED_BODY = (
+    b'{"data":{"appId":"test_app_id","entityType":"test_entity_type",'
+    b'"itemId":"test_item_id"}}'
+)
+_EXPECTED_EMPTY_BODY = b'{"data":{"appId":"","entityType":"","itemId":""}}'
+
+
+@pytest.fixture
+def mock_post(monkeypatch):
+    """Replace the user_data session's post with a Mock."""
+    mock = Mock()
+    monkeypatch.setattr("pycommon.api.user_data._SESSION.post", mock)
+    return mock
 
 
 class TestLoadUserData:
     """Test suite for load_user_data function."""
 
+    @pytest.fixture(scope="class", autouse=True)
+    @classmethod
+    def api_base_url_env(cls):
+        """Point every test in the class at the same API base URL."""
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setenv("API_BASE_URL", "https://api.example.com")
+            yield
+
     def setup_method(self):
         """Set up test fixtures."""
         self.access_token = "test_access_token"
@@ -19,21 +43,12 @@ class TestLoadUserData:
         self.item_id = "test_item_id"
         self.api_base_url = "https://api.example.com"
 
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_success(self, mock_post):
+    def test_load_user_data_success(self, mock_post, make_resp):
         """Test successful user data loading."""
         # Mock successful response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "success": True,
-            "data": {"user_id": "123", "name": "Test User"},
-        }
-        mock_response.content = (
-            b'{"success": true, "data": {"user_id": "123", "name": "Test User"}}'
+        mock_post.return_value = make_resp(
+            200, {"success": True, "data": {"user_id": "123", "name": "Test User"}}
         )
-        mock_post.return_value = mock_response
 
         result = load_user_data(
             self.access_token, self.app_id, self.entity_type, self.item_id
@@ -41,13 +56,6 @@ class TestLoadUserData:
 
         # Verify the request was made correctly
         expected_endpoint = f"{self.api_base_url}/user-data/get"
-        expected_request_data = {
-            "data": {
-                "appId": self.app_id,
-                "entityType": self.entity_type,
-                "itemId": self.item_id,
-            }
-        }
         expected_headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.access_token}",
@@ -56,65 +64,46 @@ class TestLoadUserData:
         mock_post.assert_called_once_with(
             expected_endpoint,
             headers=expected_headers,
-            data=json.dumps(expected_request_data),
+            data=_EXPECTED_BODY,
+            timeout=DEFAULT_TIMEOUT,
         )
 
         # Verify the result
         assert result == {"user_id": "123", "name": "Test User"}
 
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_success_false(self, mock_post):
-        """Test response with success=False."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": False, "error": "Invalid request"}
-        mock_response.content = b'{"success": false, "error": "Invalid request"}'
-        mock_post.return_value = mock_response
-
-        result = load_user_data(
-            self.access_token, self.app_id, self.entity_type, self.item_id
-        )
-
-        assert result is None
-
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_non_200_status(self, mock_post):
-        """Test response with non-200 status code."""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.json.return_value = {"success": False, "error": "Not found"}
-        mock_response.content = b'{"success": false, "error": "Not found"}'
-        mock_post.return_value = mock_response
-
-        result = load_user_data(
-            self.access_token, self.app_id, self.entity_type, self.item_id
-        )
-
-        assert result is None
-
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_success_no_data(self, mock_post):
-        """Test successful response but no data field."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True}
-        mock_response.content = b'{"success": true}'
-        mock_post.return_value = mock_response
-
-        result = load_user_data(
-            self.access_token, self.app_id, self.entity_type, self.item_id
-        )
-
-        assert result is None
-
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_request_exception(self, mock_post):
-        """Test handling of request exceptions."""
-        mock_post.side_effect = requests.exceptions.RequestException("Network error")
+    @pytest.mark.parametrize(
+        "response, side_effect",
+        [
+            ({"payload": {"success": False, "error": "Invalid request"}}, None),
+            (
+                {
+                    "status_code": 404,
+                    "payload": {"success": False, "error": "Not found"},
+                },
+                None,
+            ),
+            ({"payload": {"success": True}}, None),
+            (None, requests.exceptions.RequestException("Network error")),
+            ({"content": b"invalid json"}, None),
+            (None, Exception("Unexpected error")),
+        ],
+        ids=[
+            "success_false",
+            "non_200_status",
+            "success_no_data",
+            "request_exception",
+            "json_decode_error",
+            "generic_exception",
+        ],
+    )
+    def test_load_user_data_returns_none(
+        self, mock_post, make_resp, response, side_effect
+    ):
+        """Test failed calls, error responses and missing data all return None."""
+        if side_effect is not None:
+            mock_post.side_effect = side_effect
+        else:
+            mock_post.return_value = make_resp(**response)
 
         result = load_user_data(
             self.access_token, self.app_id, self.entity_type, self.item_id
@@ -122,66 +111,27 @@ class TestLoadUserData:
 
         assert result is None
 
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_json_decode_error(self, mock_post):
-        """Test handling of JSON decode errors."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.side_effect = json.JSONDecodeError("Invalid JSON", "", 0)
-        mock_response.content = b"invalid json"
-        mock_post.return_value = mock_response
-
-        result = load_user_data(
-            self.access_token, self.app_id, self.entity_type, self.item_id
+    def test_load_user_data_logs_messages(self, mock_post, make_resp, caplog):
+        """Test that the call and its response are logged at debug level."""
+        mock_post.return_value = make_resp(
+            200, {"success": True, "data": {"test": "data"}}
         )
 
-        assert result is None
-
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_generic_exception(self, mock_post):
-        """Test handling of generic exceptions."""
-        mock_post.side_effect = Exception("Unexpected error")
-
-        result = load_user_data(
-            self.access_token, self.app_id, self.entity_type, self.item_id
-        )
-
-        assert result is None
-
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    @patch("builtins.print")
-    def test_load_user_data_prints_messages(self, mock_print, mock_post):
-        """Test that appropriate messages are printed."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True, "data": {"test": "data"}}
-        mock_response.content = b'{"success": true, "data": {"test": "data"}}'
-        mock_post.return_value = mock_response
+        with caplog.at_level(logging.DEBUG, logger="pycommon.api.user_data"):
+            load_user_data(
+                self.access_token, self.app_id, self.entity_type, self.item_id
+            )
 
-        load_user_data(self.access_token, self.app_id, self.entity_type, self.item_id)
-
-        # Check that print was called with expected messages
-        print_calls = [call.args[0] for call in mock_print.call_args_list]
-        assert "Initiate get user data call" in print_calls
-        assert any("Response: " in call for call in print_calls)
+        assert caplog.messages[0] == "Initiate get user data call"
+        assert caplog.messages[1].startswith("Response: ")
 
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    @patch("builtins.print")
-    def test_load_user_data_prints_error(self, mock_print, mock_post):
-        """Test that error messages are printed on exception."""
+    def test_load_user_data_logs_error(self, mock_post, caplog):
+        """Test that errors are logged on exception."""
         mock_post.side_effect = Exception("Test error")
 
         load_user_data(self.access_token, self.app_id, self.entity_type, self.item_id)
 
-        # Check that error message was printed
-        print_calls = [call.args[0] for call in mock_print.call_args_list]
-        assert any(
-            "Error getting user data: Test error" in call for call in print_calls
-        )
+        assert caplog.messages == ["Error getting user data: Test error"]
 
     def test_load_user_data_missing_env_var(self):
         """Test behavior when API_BASE_URL environment variable is missing."""
@@ -191,20 +141,15 @@ class TestLoadUserData:
                     self.access_token, self.app_id, self.entity_type, self.item_id
                 )
 
-    @patch.dict(os.environ, {"API_BASE_URL": "https://api.example.com"})
-    @patch("pycommon.api.user_data.requests.post")
-    def test_load_user_data_with_empty_parameters(self, mock_post):
+    def test_load_user_data_with_empty_parameters(self, mock_post, make_resp):
         """Test function with empty string parameters."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"success": True, "data": {"result": "test"}}
-        mock_response.content = b'{"success": true, "data": {"result": "test"}}'
-        mock_post.return_value = mock_response
+        mock_post.return_value = make_resp(
+            200, {"success": True, "data": {"result": "test"}}
+        )
 
         result = load_user_data("", "", "", "")
 
         # Verify the request was made with empty parameters
-        expected_request_data = {"data": {"appId": "", "entityType": "", "itemId": ""}}
         expected_headers = {
             "Content-Type": "application/json",
             "Authorization": "Bearer ",
@@ -213,7 +158,72 @@ class TestLoadUserData:
         mock_post.assert_called_once_with(
             f"{self.api_base_url}/user-data/get",
             headers=expected_headers,
-            data=json.dumps(expected_request_data),
+            data=_EXPECTED_EMPTY_BODY,
+            timeout=DEFAULT_TIMEOUT,
         )
 
         assert result == {"result": "test"}
+
+
+class TestLoadUserDataBulk:
+    """Test suite for load_user_data_bulk function."""
+
+    @patch("pycommon.api.user_data.load_user_data")
+    def test_load_user_data_bulk_keys_by_triple(self, mock_load, thread_pool):
+        """Test each item is loaded and results are keyed by its triple."""
+        mock_load.side_effect = lambda token, app_id, entity_type, item_id: (
+            {"item": item_id} if item_id != "b" else None
+        )
+        items = [("app", "entity", item_id) for item_id in ("a", "b", "c")]
+
+        result = load_user_data_bulk("test_token", items, executor=thread_pool)
+
+        assert result == {
+            ("app", "entity", "a"): {"item": "a"},
+            ("app", "entity", "b"): None,
+            ("app", "entity", "c"): {"item": "c"},
+        }
+        assert mock_load.call_count == 3
+        mock_load.assert_any_call("test_token", "app", "entity", "a")
+
+    @patch("pycommon.api.user_data.load_user_data")
+    def test_load_user_data_bulk_same_item_id(self, mock_load, thread_pool):
+        """Test triples sharing an item_id are kept apart, repeats fetched once."""
+        mock_load.side_effect = lambda token, app_id, entity_type, item_id: {
+            "from": (app_id, entity_type)
+        }
+        items = [
+            ("app1", "entity", "a"),
+            ("app2", "entity", "a"),
+            ("app1", "other", "a"),
+            ("app1", "entity", "a"),
+        ]
+
+        result = load_user_data_bulk("test_token", items, executor=thread_pool)
+
+        assert result == {
+            ("app1", "entity", "a"): {"from": ("app1", "entity")},
+            ("app2", "entity", "a"): {"from": ("app2", "entity")},
+            ("app1", "other", "a"): {"from": ("app1", "other")},
+        }
+        assert mock_load.call_count == 3
+
+    @patch("pycommon.api.user_data.load_user_data")
+    def test_load_user_data_bulk_empty(self, mock_load, thread_pool):
+        """Test an empty batch returns immediately without submitting work."""
+        assert load_user_data_bulk("test_token", [], executor=thread_pool) == {}
+        mock_load.assert_not_called()
+
+    @patch("pycommon.api.user_data.load_user_data")
+    @patch("pycommon.api.user_data.shared_executor")
+    def test_load_user_data_bulk_default_executor(
+        self, mock_shared_executor, mock_load, thread_pool
+    ):
+        """Test the shared module-level pool is used when none is given."""
+        mock_shared_executor.return_value = thread_pool
+        mock_load.return_value = {"test": "data"}
+
+        result = load_user_data_bulk("test_token", [("app", "entity", "a")])
+
+        assert result == {("app", "entity", "a"): {"test": "data"}}
+        mock_shared_executor.assert_called_once_with()
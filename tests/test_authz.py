@@ -1,4 +1,8 @@
+import copy
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from types import MappingProxyType, MethodType, SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import boto3
@@ -8,10 +12,21 @@ from jose.exceptions import JWTClaimsError
 from jsonschema.exceptions import ValidationError
 from requests import ConnectionError, HTTPError
 
+from pycommon.api._http import DEFAULT_TIMEOUT
 from pycommon.authz import (
+    _SESSION,
+    _account_reads,
+    _claims_cache,
     _determine_api_user,
+    _dynamodb,
+    _dynamodb_table,
+    _env_number,
+    _get_account_item,
+    _jwks_cache,
     _parse_and_validate,
+    _parse_expiration_date,
     _parse_token,
+    _rule_index,
     _validate_data,
     add_api_access_types,
     api_claims,
@@ -48,6 +63,82 @@ share_load_schema = {
     "required": ["id"],
 }
 
+# Request body verify_user_as_admin is expected to send, as compact JSON bytes
+_ADMIN_BODY = b'{"data":{"purpose":"mock_purpose"}}'
+
+# Environment get_claims reads, served through the patched os.environ.get
+_BASE_ENV = MappingProxyType(
+    {
+        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
+        "OAUTH_AUDIENCE": "mock-audience",
+        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
+        "IDP_PREFIX": "mockprefix",
+    }
+)
+
+# Settings get_claims requires, each mapped to the environment without it
+_REQUIRED_CLAIMS_ENV = (
+    "OAUTH_ISSUER_BASE_URL",
+    "OAUTH_AUDIENCE",
+    "ACCOUNTS_DYNAMO_TABLE",
+)
+_ENV_WITHOUT = MappingProxyType(
+    {
+        name: MappingProxyType({k: v for k, v in _BASE_ENV.items() if k != name})
+        for name in _REQUIRED_CLAIMS_ENV
+    }
+)
+
+# Environment for the get_claims JWT error tests
+_JWT_ENV = MappingProxyType(
+    {
+        "OAUTH_ISSUER_BASE_URL": "issuer",
+        "OAUTH_AUDIENCE": "aud",
+        "ACCOUNTS_DYNAMO_TABLE": "table",
+    }
+)
+
+# Environment api_claims and is_rate_limited read through the patched os.getenv
+_API_KEYS_ENV = MappingProxyType({"API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table"})
+_API_COSTS_ENV = MappingProxyType(
+    {
+        "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
+        "COST_CALCULATIONS_DYNAMO_TABLE": "mock_cost_calculations_table",
+    }
+)
+
+# DynamoDB get_item results for the accounts table in the get_claims tests;
+# get_claims only reads them, so the tests share these instances
+_ITEM_RATE_LIMITED = {
+    "Item": {
+        "accounts": [
+            {
+                "id": "mock_account",
+                "isDefault": True,
+                "rateLimit": {"rate": 42, "period": "Hourly"},
+            }
+        ]
+    }
+}
+_ITEM_DEFAULT = {
+    "Item": {
+        "accounts": [
+            {"id": "mock_account_1", "isDefault": False},
+            {"id": "mock_account_2", "isDefault": True},
+        ]
+    }
+}
+_ITEM_NO_DEFAULT = {
+    "Item": {
+        "accounts": [
+            {"id": "mock_account_1", "isDefault": False},
+            {"id": "mock_account_2", "isDefault": False},
+        ]
+    }
+}
+_ITEM_EMPTY = {"Item": {"accounts": []}}
+_ITEM_MISSING = {}
+
 rules = {
     "validators": {
         "/state/share": {"append": share_schema, "read": {}},
@@ -63,15 +154,76 @@ def always_allow_permission_checker(user, type, op, data):
 always_allow_permission_checker(None, None, None, None)
 
 
-@patch("pycommon.authz.requests.post")
-@patch("pycommon.authz.os.environ.get")
-def test_verify_user_as_admin_success(mock_get_env, mock_post):
-    mock_get_env.return_value = "http://mock-api.com"
+@pytest.fixture(autouse=True)
+def clear_jwks_cache():
+    """Start every test without any cached JWKS keys."""
+    _jwks_cache.clear()
+    yield
+    _jwks_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_claims_cache():
+    """Start every test without any cached get_claims results."""
+    _claims_cache.clear()
+    yield
+    _claims_cache.clear()
+
+
+@pytest.fixture(scope="module")
+def mock_boto3():
+    """One boto3.resource mock patched into authz for the whole module.
+
+    Each xdist worker process sets up its own copy, and reset_boto3 clears
+    it between tests.
+    """
+    with patch("pycommon.authz.boto3.resource") as mock:
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def reset_boto3(mock_boto3):
+    """Clear the calls, configured tables and cached tables around each test."""
+    _dynamodb.cache_clear()
+    _dynamodb_table.cache_clear()
+    yield
+    _dynamodb.cache_clear()
+    _dynamodb_table.cache_clear()
+    mock_boto3.reset_mock(return_value=True, side_effect=True)
 
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": True, "isAdmin": True}
-    mock_post.return_value = mock_response
+
+def _table(get_item_result):
+    """DynamoDB Table stub whose get_item returns ``get_item_result``."""
+    return SimpleNamespace(get_item=lambda **kwargs: get_item_result)
+
+
+@pytest.fixture
+def mocked_authz(monkeypatch, mock_boto3):
+    """Replace the JWKS request, env lookups, DynamoDB and JWT calls in authz.
+
+    Returns a namespace holding the MagicMock installed for each of them;
+    boto3_resource is the module's shared mock_boto3.
+    """
+    mocks = SimpleNamespace(
+        requests_get=MagicMock(),
+        env_get=MagicMock(),
+        boto3_resource=mock_boto3,
+        get_unverified_header=MagicMock(),
+        jwt_decode=MagicMock(),
+    )
+    monkeypatch.setattr("pycommon.authz.requests.get", mocks.requests_get)
+    monkeypatch.setattr("os.environ.get", mocks.env_get)
+    monkeypatch.setattr(
+        "pycommon.authz.jwt.get_unverified_header", mocks.get_unverified_header
+    )
+    monkeypatch.setattr("pycommon.authz.jwt.decode", mocks.jwt_decode)
+    return mocks
+
+
+@patch("pycommon.authz._SESSION.post")
+@patch.dict("os.environ", {"API_BASE_URL": "http://mock-api.com"})
+def test_verify_user_as_admin_success(mock_post, make_resp):
+    mock_post.return_value = make_resp(200, {"success": True, "isAdmin": True})
 
     result = verify_user_as_admin("mock_token", "mock_purpose")
 
@@ -82,400 +234,350 @@ def test_verify_user_as_admin_success(mock_get_env, mock_post):
             "Content-Type": "application/json",
             "Authorization": "Bearer mock_token",
         },
-        data=json.dumps({"data": {"purpose": "mock_purpose"}}),
+        data=_ADMIN_BODY,
+        timeout=DEFAULT_TIMEOUT,
     )
 
 
-@patch("pycommon.authz.requests.post")
-@patch("pycommon.authz.os.environ.get")
-def test_verify_user_as_admin_failure(mock_get_env, mock_post):
-    mock_get_env.return_value = "http://mock-api.com"
+@patch.dict("os.environ", {"API_BASE_URL": "http://mock-api.com"})
+def test_verify_user_as_admin_reuses_session(monkeypatch, make_resp):
+    sessions = []
 
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {"success": False}
-    mock_post.return_value = mock_response
+    def post(self, url, **kwargs):
+        sessions.append(self)
+        return make_resp(200, {"success": True, "isAdmin": True})
 
-    result = verify_user_as_admin("mock_token", "mock_purpose")
+    monkeypatch.setattr("pycommon.authz._SESSION.post", MethodType(post, _SESSION))
+    monkeypatch.setattr(
+        "pycommon.authz.requests.post", MagicMock(side_effect=AssertionError)
+    )
 
-    assert result is False
+    assert verify_user_as_admin("mock_token", "mock_purpose") is True
+    assert verify_user_as_admin("mock_token", "mock_purpose") is True
 
+    assert sessions == [_SESSION, _SESSION]
+    assert _SESSION.get_adapter("http://mock-api.com") is _SESSION.get_adapter(
+        "https://mock-api.com"
+    )
 
-@patch("pycommon.authz.requests.post")
-@patch("pycommon.authz.os.environ.get")
-def test_verify_user_as_admin_http_error(mock_get_env, mock_post):
-    mock_get_env.return_value = "http://mock-api.com"
 
-    mock_post.side_effect = HTTPError("HTTP error")
+@pytest.mark.parametrize(
+    "response, side_effect",
+    [
+        ({"payload": {"success": False}}, None),
+        (None, HTTPError("HTTP error")),
+        (None, ConnectionError("Connection error")),
+        ({"content": b"<html>"}, None),
+    ],
+    ids=["failure", "http_error", "connection_error", "json_decode_error"],
+)
+@patch("pycommon.authz._SESSION.post")
+@patch.dict("os.environ", {"API_BASE_URL": "http://mock-api.com"})
+def test_verify_user_as_admin_returns_false(
+    mock_post, make_resp, response, side_effect
+):
+    if side_effect is not None:
+        mock_post.side_effect = side_effect
+    else:
+        mock_post.return_value = make_resp(**response)
 
     result = verify_user_as_admin("mock_token", "mock_purpose")
 
     assert result is False
 
 
-@patch("pycommon.authz.requests.post")
-@patch("pycommon.authz.os.environ.get")
-def test_verify_user_as_admin_connection_error(mock_get_env, mock_post):
-    mock_get_env.return_value = "http://mock-api.com"
+def test_get_claims_success(mocked_authz, make_resp):
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
 
-    mock_post.side_effect = ConnectionError("Connection error")
+    mocked_authz.requests_get.return_value = make_resp(
+        200, {"keys": [{"kid": "mock_kid", "key": "mock_key"}]}
+    )
 
-    result = verify_user_as_admin("mock_token", "mock_purpose")
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+    mocked_authz.jwt_decode.return_value = {"username": "mockprefix_mockuser"}
 
-    assert result is False
+    mock_table = _table(_ITEM_RATE_LIMITED)
+    mocked_authz.boto3_resource.return_value.Table.return_value = mock_table
 
+    result = get_claims("mock_token")
 
-@patch("pycommon.authz.requests.post")
-@patch("pycommon.authz.os.environ.get")
-def test_verify_user_as_admin_json_decode_error(mock_get_env, mock_post):
-    mock_get_env.return_value = "http://mock-api.com"
+    assert result["username"] == "mockuser"
+    assert result["account"] == "mock_account"
+    assert result["allowed_access"] == ["full_access"]
+    assert result["rate_limit"] == {"rate": 42, "period": "Hourly"}
 
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.side_effect = json.JSONDecodeError("Expecting value", "", 0)
-    mock_post.return_value = mock_response
 
-    result = verify_user_as_admin("mock_token", "mock_purpose")
+def test_get_claims_jwks_is_cached(mocked_authz, make_resp, monkeypatch):
+    monkeypatch.setattr("pycommon.authz._CLAIMS_CACHE_TTL", 0)
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+    mocked_authz.requests_get.return_value = make_resp(
+        200, {"keys": [{"kid": "mock_kid", "key": "mock_key"}]}
+    )
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+    mocked_authz.jwt_decode.return_value = {"username": "mockuser"}
+    mocked_authz.boto3_resource.return_value.Table.return_value = _table(_ITEM_DEFAULT)
 
-    assert result is False
+    for _ in range(3):
+        get_claims("mock_token")
 
+    assert mocked_authz.requests_get.call_count == 1
+    assert mocked_authz.jwt_decode.call_count == 3
+    assert mocked_authz.jwt_decode.call_args.args[1] == {
+        "kid": "mock_kid",
+        "key": "mock_key",
+    }
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_success(
-    mock_decode, mock_get_header, mock_boto3, mock_get_env, mock_requests_get
-):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-        "IDP_PREFIX": "mockprefix",
-    }.get(key, default)
 
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "mock_kid", "key": "mock_key"}]}),
-    )
+def test_get_claims_jwks_refetched_for_new_kid(mocked_authz, make_resp, monkeypatch):
+    monkeypatch.setattr("pycommon.authz._CLAIMS_CACHE_TTL", 0)
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+    mocked_authz.requests_get.side_effect = [
+        make_resp(200, {"keys": [{"kid": "old_kid"}]}),
+        make_resp(200, {"keys": [{"kid": "old_kid"}, {"kid": "new_kid"}]}),
+    ]
+    mocked_authz.jwt_decode.return_value = {"username": "mockuser"}
+    mocked_authz.boto3_resource.return_value.Table.return_value = _table(_ITEM_DEFAULT)
 
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockprefix_mockuser"}
+    for kid in ("old_kid", "new_kid", "old_kid", "new_kid"):
+        mocked_authz.get_unverified_header.return_value = {"kid": kid}
+        get_claims("mock_token")
 
-    mock_table = MagicMock()
-    mock_table.get_item.return_value = {
-        "Item": {
-            "accounts": [
-                {
-                    "id": "mock_account",
-                    "isDefault": True,
-                    "rateLimit": {"rate": 42, "period": "Hourly"},
-                }
-            ],
-        }
-    }
-    mock_boto3.return_value.Table.return_value = mock_table
+    assert mocked_authz.requests_get.call_count == 2
 
-    result = get_claims("mock_token")
 
-    assert result["username"] == "mockuser"
-    assert result["account"] == "mock_account"
-    assert result["allowed_access"] == ["full_access"]
-    assert result["rate_limit"] == {"rate": 42, "period": "Hourly"}
+def test_get_claims_jwks_refetched_after_ttl(mocked_authz, make_resp, monkeypatch):
+    monkeypatch.setattr("pycommon.authz._CLAIMS_CACHE_TTL", 0)
+    monkeypatch.setattr("pycommon.authz._JWKS_TTL_SECONDS", 0)
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+    mocked_authz.requests_get.side_effect = [
+        make_resp(200, {"keys": [{"kid": "mock_kid", "key": "old_key"}]}),
+        make_resp(200, {"keys": [{"kid": "mock_kid", "key": "new_key"}]}),
+    ]
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+    mocked_authz.jwt_decode.return_value = {"username": "mockuser"}
+    mocked_authz.boto3_resource.return_value.Table.return_value = _table(_ITEM_DEFAULT)
 
+    get_claims("mock_token")
+    get_claims("mock_token")
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-def test_get_claims_missing_env(mock_get_env, mock_requests_get):
-    required_env_vars = [
-        "OAUTH_ISSUER_BASE_URL",
-        "OAUTH_AUDIENCE",
-        "ACCOUNTS_DYNAMO_TABLE",
-    ]
+    assert mocked_authz.requests_get.call_count == 2
+    assert mocked_authz.jwt_decode.call_args.args[1]["key"] == "new_key"
 
-    for missing_var in required_env_vars:
-        mock_get_env.side_effect = lambda key, default, missing_var=missing_var: (
-            None if key == missing_var else "mock_value"
-        )
 
-        with pytest.raises(EnvVarError, match=f"Env Var: '{missing_var}' is not set"):
-            get_claims("mock_token")
+def test_get_account_item_reads_table(mocked_authz):
+    table = mocked_authz.boto3_resource.return_value.Table.return_value
+    table.get_item.return_value = _ITEM_DEFAULT
 
+    assert _get_account_item("accounts", "mockuser") is _ITEM_DEFAULT
 
-@patch("pycommon.authz.os.environ.get")
-def test_get_claims_token_is_none(mock_get_env):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-        "IDP_PREFIX": "mockprefix",
-    }.get(key, default)
-    with pytest.raises(ClaimException, match="No Valid Access Token Found"):
-        get_claims(None)
+    mocked_authz.boto3_resource.return_value.Table.assert_called_once_with("accounts")
+    table.get_item.assert_called_once_with(Key={"user": "mockuser"})
+    assert _account_reads == {}
 
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-def test_get_claims_invalid_jwks(mock_get_env, mock_requests_get):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
+def test_dynamodb_tables_share_one_resource(mocked_authz):
+    dynamodb = mocked_authz.boto3_resource.return_value
+    dynamodb.Table.side_effect = lambda name: SimpleNamespace(name=name)
 
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(side_effect=json.JSONDecodeError("Expecting value", "", 0)),
-    )
+    accounts = _dynamodb_table("accounts")
 
-    with pytest.raises(ClaimException, match="Invalid JWKS response"):
-        get_claims("mock_token")
+    assert _dynamodb_table("accounts") is accounts
+    assert _dynamodb_table("api_keys").name == "api_keys"
+    mocked_authz.boto3_resource.assert_called_once()
+    assert mocked_authz.boto3_resource.call_args.args == ("dynamodb",)
+    config = mocked_authz.boto3_resource.call_args.kwargs["config"]
+    assert config.tcp_keepalive is True
+    assert dynamodb.Table.call_count == 2
 
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.jwt.get_unverified_header")
-def test_get_claims_missing_rsa_key(mock_get_header, mock_get_env, mock_requests_get):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
+def test_get_account_item_waits_for_in_flight_read(mocked_authz, monkeypatch):
+    in_flight = Future()
+    monkeypatch.setitem(_account_reads, ("accounts", "mockuser"), in_flight)
+
+    with ThreadPoolExecutor(1) as pool:
+        waiting = pool.submit(_get_account_item, "accounts", "mockuser")
+        in_flight.set_result(_ITEM_DEFAULT)
+        assert waiting.result(timeout=5) is _ITEM_DEFAULT
+
+    mocked_authz.boto3_resource.assert_not_called()
+
+
+def test_get_account_item_error_is_raised_and_cleared(mocked_authz):
+    table = mocked_authz.boto3_resource.return_value.Table.return_value
+    table.get_item.side_effect = RuntimeError("throttled")
 
-    mock_requests_get.return_value = MagicMock(
-        ok=True, json=MagicMock(return_value={"keys": {}})
+    with pytest.raises(RuntimeError, match="throttled"):
+        _get_account_item("accounts", "mockuser")
+
+    assert _account_reads == {}
+
+
+@pytest.fixture
+def cacheable_claims(mocked_authz, make_resp):
+    """mocked_authz set up for a get_claims call that succeeds."""
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+    mocked_authz.requests_get.return_value = make_resp(
+        200, {"keys": [{"kid": "mock_kid", "key": "mock_key"}]}
     )
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+    mocked_authz.jwt_decode.side_effect = lambda *args, **kwargs: {
+        "username": "mockprefix_mockuser"
+    }
+    mocked_authz.boto3_resource.return_value.Table.return_value = _table(_ITEM_DEFAULT)
+    return mocked_authz
 
-    mock_get_header.return_value = {"kid": "mock_kid"}
 
-    with pytest.raises(ClaimException, match="No valid RSA key found in JWKS"):
-        get_claims("mock_token")
+def test_get_claims_is_cached_per_token(cacheable_claims):
+    first = get_claims("mock_token")
+    rate_limit = copy.deepcopy(first["rate_limit"])
+    first["account"] = "mutated"
+    first["allowed_access"].append("mutated")
+    first["rate_limit"]["mutated"] = True
+    second = get_claims("mock_token")
 
+    assert second["account"] == "mock_account_2"
+    assert second["allowed_access"] == ["full_access"]
+    assert second["rate_limit"] == rate_limit
+    assert second["username"] == "mockuser"
+    assert cacheable_claims.jwt_decode.call_count == 1
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_with_rsa_key(
-    mock_decode, mock_get_header, mock_boto3, mock_get_env, mock_requests_get
-):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
+    get_claims("other_token")
 
-    mock_table = MagicMock()
-    mock_table.get_item.return_value = {}
-
-    mock_table.get_item.return_value = {
-        "Item": {
-            "accounts": [
-                {"id": "mock_account_1", "isDefault": False},
-                {"id": "mock_account_2", "isDefault": True},
-            ],
-        }
+    assert cacheable_claims.jwt_decode.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, 5.0), ("2.5", 2.5), ("five", 5.0)],
+    ids=["unset", "valid", "invalid"],
+)
+def test_env_number(monkeypatch, value, expected):
+    if value is not None:
+        monkeypatch.setenv("AUTHZ_JWT_CACHE_TTL", value)
+    else:
+        monkeypatch.delenv("AUTHZ_JWT_CACHE_TTL", raising=False)
+
+    assert _env_number("AUTHZ_JWT_CACHE_TTL", 5.0, float) == expected
+
+
+def test_get_claims_cache_stops_at_token_exp(cacheable_claims):
+    cacheable_claims.jwt_decode.side_effect = lambda *args, **kwargs: {
+        "username": "mockuser",
+        "exp": 1,
     }
 
-    mock_boto3.return_value.Table.return_value = mock_table
+    get_claims("mock_token")
+    get_claims("mock_token")
 
-    mock_requests_get.return_value = MagicMock(
-        ok=True, json=MagicMock(return_value={"keys": [{"kid": "mock_kid"}]})
-    )
+    assert cacheable_claims.jwt_decode.call_count == 2
 
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockuser"}
 
-    x = get_claims("mock_token")
-    assert x["username"] == "mockuser"
-    assert x["account"] == "mock_account_2"
-    assert x["allowed_access"] == ["full_access"]
-    assert x["rate_limit"] == {"period": "Unlimited", "rate": None}
+def test_get_claims_cache_drops_least_recently_used(cacheable_claims, monkeypatch):
+    monkeypatch.setattr("pycommon.authz._CLAIMS_CACHE_MAX", 1)
 
+    get_claims("token_a")
+    get_claims("token_b")
+    get_claims("token_a")
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_with_no_kid_found(
-    mock_decode, mock_get_header, mock_get_env, mock_requests_get
-):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
+    assert cacheable_claims.jwt_decode.call_count == 3
+    assert len(_claims_cache) == 1
 
-    mock_requests_get.return_value = MagicMock(
-        ok=True, json=MagicMock(return_value={"keys": [{"kid": "bad_kid"}]})
-    )
 
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockuser"}
+def test_get_claims_cache_disabled_by_zero_ttl(cacheable_claims, monkeypatch):
+    monkeypatch.setattr("pycommon.authz._CLAIMS_CACHE_TTL", 0)
 
-    with pytest.raises(ClaimException, match="No valid RSA key found in JWKS"):
+    get_claims("mock_token")
+    get_claims("mock_token")
+
+    assert cacheable_claims.jwt_decode.call_count == 2
+
+
+@pytest.mark.parametrize("missing_var", _REQUIRED_CLAIMS_ENV)
+def test_get_claims_missing_env(mocked_authz, missing_var):
+    mocked_authz.env_get.side_effect = _ENV_WITHOUT[missing_var].get
+
+    with pytest.raises(EnvVarError, match=f"Env Var: '{missing_var}' is not set"):
         get_claims("mock_token")
 
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_no_dynamodb_item(
-    mock_decode, mock_get_header, mock_boto3, mock_get_env, mock_requests_get
-):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
+def test_get_claims_token_is_none(mocked_authz):
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+    with pytest.raises(ClaimException, match="No Valid Access Token Found"):
+        get_claims(None)
 
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "mock_kid", "key": "mock_key"}]}),
-    )
 
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockuser"}
+def test_get_claims_invalid_jwks(mocked_authz, make_resp):
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
 
-    mock_table = MagicMock()
-    mock_table.get_item.return_value = {}
-    mock_boto3.return_value.Table.return_value = mock_table
+    mocked_authz.requests_get.return_value = make_resp(200, content=b"not json")
 
-    # Should no longer raise KeyError, but should handle gracefully
-    result = get_claims("mock_token")
-    assert result["username"] == "mockuser"
-    assert result["account"] == "general_account"
-    assert result["allowed_access"] == ["full_access"]
-    assert result["rate_limit"] == {"period": "Unlimited", "rate": None}
+    with pytest.raises(ClaimException, match="Invalid JWKS response"):
+        get_claims("mock_token")
 
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-def test_get_claims_jwks_request_failed(mock_get_env, mock_requests_get):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
+def test_get_claims_missing_rsa_key(mocked_authz, make_resp):
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
 
-    mock_requests_get.return_value = MagicMock(ok=False, status_code=500)
+    mocked_authz.requests_get.return_value = make_resp(200, {"keys": {}})
 
-    with pytest.raises(
-        ClaimException,
-        match="Failed to retrieve JWKS from http://mock-issuer.com/.well-known/jwks.json, status code: 500",  # noqa: E501
-    ):
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+
+    with pytest.raises(ClaimException, match="No valid RSA key found in JWKS"):
         get_claims("mock_token")
 
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_default_account(
-    mock_decode, mock_get_header, mock_boto3, mock_get_env, mock_requests_get
-):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, None)
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "mock_kid", "key": "mock_key"}]}),
+@pytest.mark.parametrize(
+    "item, expected_account",
+    [
+        (_ITEM_DEFAULT, "mock_account_2"),
+        (_ITEM_NO_DEFAULT, "general_account"),
+        (_ITEM_EMPTY, "general_account"),
+        (_ITEM_MISSING, "general_account"),
+    ],
+    ids=["default_account", "no_default_account", "no_accounts_list", "no_item"],
+)
+def test_get_claims_account(mocked_authz, make_resp, item, expected_account):
+    """The default account is selected, falling back to general_account."""
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+    mocked_authz.requests_get.return_value = make_resp(
+        200, {"keys": [{"kid": "mock_kid", "key": "mock_key"}]}
     )
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockuser"}
-    mock_table = MagicMock()
-    mock_table.get_item.return_value = {
-        "Item": {
-            "accounts": [
-                {"id": "mock_account_1", "isDefault": False},
-                {"id": "mock_account_2", "isDefault": True},
-            ],
-        }
-    }
-    mock_boto3.return_value.Table.return_value = mock_table
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+    mocked_authz.jwt_decode.return_value = {"username": "mockuser"}
+    mocked_authz.boto3_resource.return_value.Table.return_value = _table(item)
+
     result = get_claims("mock_token")
+
     assert result["username"] == "mockuser"
-    assert result["account"] == "mock_account_2"
+    assert result["account"] == expected_account
     assert result["allowed_access"] == ["full_access"]
     assert result["rate_limit"] == {"period": "Unlimited", "rate": None}
 
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_no_default_account(
-    mock_decode, mock_get_header, mock_boto3, mock_get_env, mock_requests_get
-):
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "mock_kid", "key": "mock_key"}]}),
+def test_get_claims_with_no_kid_found(mocked_authz, make_resp):
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+
+    mocked_authz.requests_get.return_value = make_resp(
+        200, {"keys": [{"kid": "bad_kid"}]}
     )
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockuser"}
-    mock_table = MagicMock()
-    mock_table.get_item.return_value = {
-        "Item": {
-            "accounts": [
-                {"id": "mock_account_1", "isDefault": False},
-                {"id": "mock_account_2", "isDefault": False},
-            ],
-        }
-    }
-    mock_boto3.return_value.Table.return_value = mock_table
-    result = get_claims("mock_token")
-    assert result["username"] == "mockuser"
-    assert result["account"] == "general_account"
-    assert result["allowed_access"] == ["full_access"]
-    assert result["rate_limit"] == {"period": "Unlimited", "rate": None}
 
+    mocked_authz.get_unverified_header.return_value = {"kid": "mock_kid"}
+    mocked_authz.jwt_decode.return_value = {"username": "mockuser"}
 
-@patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.jwt.get_unverified_header")
-@patch("pycommon.authz.jwt.decode")
-def test_get_claims_no_accounts_list(
-    mock_decode, mock_get_header, mock_boto3, mock_get_env, mock_requests_get
-):
-    """Test the case where no default account is found and the print statement is
-    executed."""
-    mock_get_env.side_effect = lambda key, default: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "mock_kid", "key": "mock_key"}]}),
-    )
-    mock_get_header.return_value = {"kid": "mock_kid"}
-    mock_decode.return_value = {"username": "mockuser"}
-    mock_table = MagicMock()
-    mock_table.get_item.return_value = {
-        "Item": {
-            "accounts": [],  # Empty accounts list
-        }
-    }
-    mock_boto3.return_value.Table.return_value = mock_table
-    result = get_claims("mock_token")
-    assert result["username"] == "mockuser"
-    assert result["account"] == "general_account"
-    assert result["allowed_access"] == ["full_access"]
-    assert result["rate_limit"] == {"period": "Unlimited", "rate": None}
+    with pytest.raises(ClaimException, match="No valid RSA key found in JWKS"):
+        get_claims("mock_token")
+
+
+def test_get_claims_jwks_request_failed(mocked_authz, make_resp):
+    mocked_authz.env_get.side_effect = _BASE_ENV.get
+
+    mocked_authz.requests_get.return_value = make_resp(500)
+
+    with pytest.raises(
+        ClaimException,
+        match="Failed to retrieve JWKS from http://mock-issuer.com/.well-known/jwks.json, status code: 500",  # noqa: E501
+    ):
+        get_claims("mock_token")
 
 
 def test_parse_and_validate_success():
@@ -703,8 +805,7 @@ def test_parse_and_validate_container_lambda_function_url_format():
     assert result == ["/state/share", {"data": {"key": "test", "value": 123}}]
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_success(mock_getenv, mock_boto3):
     import pycommon.authz
 
@@ -715,10 +816,7 @@ def test_api_claims_success(mock_getenv, mock_boto3):
         # Set access types to include the ones used in this test
         pycommon.authz._access_types = ["full_access", "file_upload", "share"]
 
-        mock_getenv.side_effect = lambda key: {
-            "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-            "COST_CALCULATIONS_DYNAMO_TABLE": "mock_cost_calculations_table",
-        }.get(key)
+        mock_getenv.side_effect = _API_COSTS_ENV.get
         mock_api_keys_table = MagicMock()
         mock_api_keys_table.query.return_value = {
             "Items": [
@@ -762,8 +860,7 @@ def test_api_claims_success(mock_getenv, mock_boto3):
         pycommon.authz._access_types = original_access_types
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 @patch("pycommon.authz.TokenV1")
 def test_api_claims_success_with_v1_token(mock_token_v1, mock_getenv, mock_boto3):
     """Test api_claims with new amp-v1- token format"""
@@ -781,10 +878,7 @@ def test_api_claims_success_with_v1_token(mock_token_v1, mock_getenv, mock_boto3
         mock_token_v1_instance.key = "hashed_token_value"
         mock_token_v1.return_value = mock_token_v1_instance
 
-        mock_getenv.side_effect = lambda key: {
-            "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-            "COST_CALCULATIONS_DYNAMO_TABLE": "mock_cost_calculations_table",
-        }.get(key)
+        mock_getenv.side_effect = _API_COSTS_ENV.get
         mock_api_keys_table = MagicMock()
         mock_api_keys_table.query.return_value = {
             "Items": [
@@ -839,12 +933,9 @@ def test_api_claims_success_with_v1_token(mock_token_v1, mock_getenv, mock_boto3
         pycommon.authz._access_types = original_access_types
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_key_not_found(mock_getenv, mock_boto3):
-    mock_getenv.side_effect = lambda key: {
-        "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-    }.get(key)
+    mock_getenv.side_effect = _API_KEYS_ENV.get
 
     mock_table = MagicMock()
     mock_table.query.return_value = {"Items": []}
@@ -854,12 +945,9 @@ def test_api_claims_key_not_found(mock_getenv, mock_boto3):
         api_claims({}, {}, "mock_token")
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_inactive_key(mock_getenv, mock_boto3):
-    mock_getenv.side_effect = lambda key: {
-        "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-    }.get(key)
+    mock_getenv.side_effect = _API_KEYS_ENV.get
     mock_table = MagicMock()
     mock_table.query.return_value = {
         "Items": [{"apiKey": "mock_token", "active": False}]
@@ -869,16 +957,54 @@ def test_api_claims_inactive_key(mock_getenv, mock_boto3):
         api_claims({}, {}, "mock_token")
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
-def test_api_claims_expired_key(mock_getenv, mock_boto3):
-    mock_getenv.side_effect = lambda key: {
-        "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-    }.get(key)
+@pytest.mark.parametrize(
+    "expiration_date", ["2000-01-01", date.today().isoformat()], ids=["past", "today"]
+)
+@patch("os.getenv")
+def test_api_claims_expired_key(mock_getenv, mock_boto3, expiration_date):
+    mock_getenv.side_effect = _API_KEYS_ENV.get
+    mock_table = MagicMock()
+    mock_table.query.return_value = {
+        "Items": [
+            {
+                "apiKey": "mock_token",
+                "active": True,
+                "expirationDate": expiration_date,
+            }
+        ]
+    }
+    mock_boto3.return_value.Table.return_value = mock_table
+    with pytest.raises(PermissionError, match="API key has expired."):
+        api_claims({}, {}, "mock_token")
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2025-12-31", date(2025, 12, 31)),
+        ("2025-1-5", date(2025, 1, 5)),
+    ],
+    ids=["padded", "not_padded"],
+)
+def test_parse_expiration_date(value, expected):
+    assert _parse_expiration_date(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value", ["20251231", "2025-W01-1", "2025-13-01", "2025/12/31", "not a date"]
+)
+def test_parse_expiration_date_rejects_malformed(value):
+    with pytest.raises(ValueError):
+        _parse_expiration_date(value)
+
+
+@patch("os.getenv")
+def test_api_claims_non_padded_expired_key(mock_getenv, mock_boto3):
+    mock_getenv.side_effect = _API_KEYS_ENV.get
     mock_table = MagicMock()
     mock_table.query.return_value = {
         "Items": [
-            {"apiKey": "mock_token", "active": True, "expirationDate": "2000-01-01"}
+            {"apiKey": "mock_token", "active": True, "expirationDate": "2000-1-5"}
         ]
     }
     mock_boto3.return_value.Table.return_value = mock_table
@@ -886,12 +1012,9 @@ def test_api_claims_expired_key(mock_getenv, mock_boto3):
         api_claims({}, {}, "mock_token")
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_no_access_rights(mock_getenv, mock_boto3):
-    mock_getenv.side_effect = lambda key: {
-        "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-    }.get(key)
+    mock_getenv.side_effect = _API_KEYS_ENV.get
     mock_table = MagicMock()
     mock_table.query.return_value = {
         "Items": [{"apiKey": "mock_token", "active": True, "accessTypes": []}]
@@ -999,6 +1122,52 @@ def test_validate_data_success():
     _validate_data("/foo", "bar", {"data": {"x": 1}}, False, validator_rules)
 
 
+def test_rule_index_is_built_when_rules_are_installed(monkeypatch):
+    schema = {"type": "object"}
+    validator_rules = {"validators": {"/foo": {"bar": schema, "baz": {}}}}
+    monkeypatch.setattr("pycommon.authz._validate_rules", None)
+    monkeypatch.setattr("pycommon.authz._rule_indexes", {})
+
+    set_validate_rules(validator_rules)
+    index = _rule_index(validator_rules, "validators")
+    validator_rules["validators"]["/foo"]["new"] = schema
+
+    assert index.keys() == {("/foo", "bar"), ("/foo", "baz")}
+    assert index[("/foo", "bar")][0] is schema
+    assert index[("/foo", "bar")][1].is_valid({})
+    assert not index[("/foo", "bar")][1].is_valid([])
+    assert _rule_index(validator_rules, "validators") is index
+    assert _rule_index(validator_rules, "api_validators") == {}
+
+    _validate_data("/foo", "bar", {"data": {}}, False, validator_rules)
+    with pytest.raises(ValidationError, match="Invalid data"):
+        _validate_data("/foo", "bar", {"data": []}, False, validator_rules)
+
+    set_validate_rules(validator_rules)
+
+    assert ("/foo", "new") in _rule_index(validator_rules, "validators")
+
+
+def test_validate_data_installed_invalid_schema(monkeypatch):
+    validator_rules = {"validators": {"/foo": {"bar": {"type": "unknown_type"}}}}
+    monkeypatch.setattr("pycommon.authz._validate_rules", None)
+    monkeypatch.setattr("pycommon.authz._rule_indexes", {})
+    set_validate_rules(validator_rules)
+
+    assert _rule_index(validator_rules, "validators")[("/foo", "bar")][1] is None
+    with pytest.raises(ValidationError, match="Invalid schema"):
+        _validate_data("/foo", "bar", {"data": {"x": 1}}, False, validator_rules)
+
+
+def test_rule_index_of_other_rules_is_not_cached():
+    validator_rules = {"validators": {"/foo": {"bar": {}}}}
+
+    index = _rule_index(validator_rules, "validators")
+
+    assert index == {("/foo", "bar"): ({}, None)}
+    assert _rule_index(validator_rules, "validators") is not index
+
+
 def test_validate_data_no_validator():
     with pytest.raises(ValidationError, match="No validator found for the operation"):
         _validate_data("/foo", "bar", {"data": {"x": 1}}, False, {})
@@ -1056,45 +1225,56 @@ def test_validate_data_empty_schema():
         pytest.fail(f"Validation with empty schema should not raise exception: {e}")
 
 
-def test_parse_token_success():
-    event = {"headers": {"Authorization": "Bearer abc123"}}
-    assert _parse_token(event) == "abc123"
-
-
-def test_parse_token_wrong_scheme():
-    event = {"headers": {"Authorization": "Basic abc123"}}
-    with pytest.raises(HTTPUnauthorized, match="No Access Token Found"):
-        _parse_token(event)
-
-
-def test_parse_token_missing_header():
-    event = {"headers": {}}
-    with pytest.raises(HTTPUnauthorized, match="No Access Token Found"):
-        _parse_token(event)
-
-
-def test_parse_token_malformed_header():
-    event = {"headers": {"Authorization": "Bearer"}}
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"Authorization": "Bearer abc123"},
+        {"authorization": "Bearer abc123"},
+        {"AUTHORIZATION": "bearer abc123"},
+        {"Authorization": "  Bearer \t abc123  "},
+        {"Content-Type": "application/json", "Authorization": "Bearer abc123"},
+    ],
+    ids=[
+        "success",
+        "case_insensitive",
+        "lowercase_scheme",
+        "surrounding_spaces",
+        "other_headers",
+    ],
+)
+def test_parse_token(headers):
+    assert _parse_token({"headers": headers}) == "abc123"
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        {"Authorization": "Basic abc123"},
+        {},
+        {"Authorization": "Bearer"},
+        {"Authorization": "Bearer   "},
+        {"Authorization": "Bearer abc 123"},
+        {"Authorization": ""},
+    ],
+    ids=[
+        "wrong_scheme",
+        "missing_header",
+        "malformed_header",
+        "extra_spaces",
+        "extra_part",
+        "empty",
+    ],
+)
+def test_parse_token_rejected(headers):
     with pytest.raises(HTTPUnauthorized, match="No Access Token Found"):
-        _parse_token(event)
-
-
-def test_parse_token_case_insensitive():
-    event = {"headers": {"authorization": "Bearer abc123"}}
-    assert _parse_token(event) == "abc123"
-
-
-def test_parse_token_extra_spaces():
-    event = {"headers": {"Authorization": "Bearer   "}}
-    with pytest.raises(HTTPUnauthorized):
-        _parse_token(event)
+        _parse_token({"headers": headers})
 
 
 @patch("pycommon.authz._parse_token")
 @patch("pycommon.authz.api_claims")
 @patch("pycommon.authz._parse_and_validate")
 @patch("pycommon.authz.get_claims")
-@patch("pycommon.authz.os.environ.get")
+@patch("os.environ.get")
 @patch("pycommon.authz.requests.get")
 def test_validated_api_access_success(
     mock_requests_get,
@@ -1103,15 +1283,11 @@ def test_validated_api_access_success(
     mock_parse_and_validate,
     mock_api_claims,
     mock_parse_token,
+    make_resp,
 ):
-    mock_get_env.side_effect = lambda key, default=None: {
-        "OAUTH_ISSUER_BASE_URL": "http://mock-issuer.com",
-        "OAUTH_AUDIENCE": "mock-audience",
-        "ACCOUNTS_DYNAMO_TABLE": "mock-accounts-table",
-    }.get(key, default)
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "mock_kid", "key": "mock_key"}]}),
+    mock_get_env.side_effect = _BASE_ENV.get
+    mock_requests_get.return_value = make_resp(
+        200, {"keys": [{"kid": "mock_kid", "key": "mock_key"}]}
     )
     mock_parse_token.return_value = "amp-token"
     mock_api_claims.return_value = {
@@ -1283,8 +1459,7 @@ def test_validated_unexpected_exception(
         test_handler_unexpected_exception(event, context)
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_rate_limit_exceeded(mock_getenv, mock_boto3):
     import pycommon.authz
 
@@ -1295,10 +1470,7 @@ def test_api_claims_rate_limit_exceeded(mock_getenv, mock_boto3):
         # Set access types to include the ones used in this test
         pycommon.authz._access_types = ["full_access", "file_upload", "share"]
 
-        mock_getenv.side_effect = lambda key: {
-            "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-            "COST_CALCULATIONS_DYNAMO_TABLE": "mock_cost_calculations_table",
-        }.get(key)
+        mock_getenv.side_effect = _API_COSTS_ENV.get
         mock_table = MagicMock()
         mock_table.query.return_value = {
             "Items": [
@@ -1324,8 +1496,7 @@ def test_api_claims_rate_limit_exceeded(mock_getenv, mock_boto3):
         pycommon.authz._access_types = original_access_types
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_unlimited_period(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     assert is_rate_limited("user", {"period": "Unlimited", "rate": 100}) == (
@@ -1334,8 +1505,7 @@ def test_is_rate_limited_unlimited_period(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_no_period(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     assert is_rate_limited("user", {"rate": 100}) == (
@@ -1344,8 +1514,7 @@ def test_is_rate_limited_no_period(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_no_items(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1357,8 +1526,7 @@ def test_is_rate_limited_no_items(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_missing_col_name(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1370,8 +1538,7 @@ def test_is_rate_limited_missing_col_name(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_hourly_cost_missing_or_malformed(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1388,8 +1555,7 @@ def test_is_rate_limited_hourly_cost_missing_or_malformed(mock_getenv, mock_boto
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_hourly_cost_exceeded(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1403,8 +1569,7 @@ def test_is_rate_limited_hourly_cost_exceeded(mock_getenv, mock_boto3):
         )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_hourly_cost_not_exceeded(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1418,8 +1583,7 @@ def test_is_rate_limited_hourly_cost_not_exceeded(mock_getenv, mock_boto3):
         )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_daily_cost_exceeded(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1431,8 +1595,7 @@ def test_is_rate_limited_daily_cost_exceeded(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_daily_cost_not_exceeded(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1444,8 +1607,7 @@ def test_is_rate_limited_daily_cost_not_exceeded(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_missing_rate(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1457,8 +1619,7 @@ def test_is_rate_limited_missing_rate(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_boto3_error(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_calc_table"
     mock_table = MagicMock()
@@ -1470,8 +1631,7 @@ def test_is_rate_limited_boto3_error(mock_getenv, mock_boto3):
     )
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_table_entry_missing(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1483,8 +1643,7 @@ def test_is_rate_limited_table_entry_missing(mock_getenv, mock_boto3):
     assert "Table entry does not exist" in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_column_missing(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1496,8 +1655,7 @@ def test_is_rate_limited_column_missing(mock_getenv, mock_boto3):
     assert "Column hourlyCost not found" in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_hourly_cost_malformed(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1509,8 +1667,7 @@ def test_is_rate_limited_hourly_cost_malformed(mock_getenv, mock_boto3):
     assert "Column hourlyCost not found in rate data" in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_rate_value_missing(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1524,8 +1681,7 @@ def test_is_rate_limited_rate_value_missing(mock_getenv, mock_boto3):
     assert "Rate value missing in rate_limit." in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_exceeded(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1542,8 +1698,7 @@ def test_is_rate_limited_exceeded(mock_getenv, mock_boto3):
         assert "rate limit exceeded" in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_not_exceeded(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1560,8 +1715,7 @@ def test_is_rate_limited_not_exceeded(mock_getenv, mock_boto3):
         assert "Rate limit not exceeded" in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_boto3_exception(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1573,8 +1727,7 @@ def test_is_rate_limited_boto3_exception(mock_getenv, mock_boto3):
     assert "Error accessing DynamoDB" in msg
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_is_rate_limited_unexpected_exception(mock_getenv, mock_boto3):
     mock_getenv.return_value = "mock_cost_table"
     mock_table = MagicMock()
@@ -1586,52 +1739,39 @@ def test_is_rate_limited_unexpected_exception(mock_getenv, mock_boto3):
     assert "Unexpected error during rate limit" in msg
 
 
+@pytest.mark.parametrize("missing", _REQUIRED_CLAIMS_ENV)
 @patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-def test_get_claims_missing_env_vars(mock_get_env, _):
-    required_vars = ["OAUTH_ISSUER_BASE_URL", "OAUTH_AUDIENCE", "ACCOUNTS_DYNAMO_TABLE"]
-    mock_get_env.side_effect = lambda key, default=None: (
-        None if key == missing else "value"
-    )
-    for missing in required_vars:
+@patch("os.environ.get")
+def test_get_claims_missing_env_vars(mock_get_env, _, missing):
+    mock_get_env.side_effect = _ENV_WITHOUT[missing].get
 
-        with pytest.raises(EnvVarError) as exc:
-            get_claims("sometoken")
-        assert f"Env Var: '{missing}' is not set" in str(exc.value)
+    with pytest.raises(EnvVarError) as exc:
+        get_claims("sometoken")
+    assert f"Env Var: '{missing}' is not set" in str(exc.value)
 
 
 @patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
-def test_get_claims_jwks_invalid_json(mock_get_env, mock_requests_get):
-    mock_get_env.side_effect = lambda key, default=None: (
-        "issuer"
-        if key == "OAUTH_ISSUER_BASE_URL"
-        else "aud" if key == "OAUTH_AUDIENCE" else "table"
-    )
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(side_effect=json.JSONDecodeError("Expecting value", "", 0)),
-    )
+@patch("os.environ.get")
+@patch("pycommon.authz.jwt.get_unverified_header")
+def test_get_claims_jwks_invalid_json(
+    mock_get_header, mock_get_env, mock_requests_get, make_resp
+):
+    mock_get_header.return_value = {"kid": "kid1"}
+    mock_get_env.side_effect = _JWT_ENV.get
+    mock_requests_get.return_value = make_resp(200, content=b"not json")
     with pytest.raises(ClaimException, match="Invalid JWKS response"):
         get_claims("sometoken")
 
 
 @patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
+@patch("os.environ.get")
 @patch("pycommon.authz.jwt.get_unverified_header")
 @patch("pycommon.authz.jwt.decode")
 def test_get_claims_jwt_decode_error(
-    mock_decode, mock_get_header, mock_get_env, mock_requests_get
+    mock_decode, mock_get_header, mock_get_env, mock_requests_get, make_resp
 ):
-    mock_get_env.side_effect = lambda key, default=None: (
-        "issuer"
-        if key == "OAUTH_ISSUER_BASE_URL"
-        else "aud" if key == "OAUTH_AUDIENCE" else "table"
-    )
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "kid1"}]}),
-    )
+    mock_get_env.side_effect = _JWT_ENV.get
+    mock_requests_get.return_value = make_resp(200, {"keys": [{"kid": "kid1"}]})
     mock_get_header.return_value = {"kid": "kid1"}
     mock_decode.side_effect = JWTError("decode error")
     with pytest.raises(ClaimException, match="Invalid JWT token"):
@@ -1639,21 +1779,14 @@ def test_get_claims_jwt_decode_error(
 
 
 @patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
+@patch("os.environ.get")
 @patch("pycommon.authz.jwt.get_unverified_header")
 @patch("pycommon.authz.jwt.decode")
 def test_get_claims_jwt_expired_sigs_error(
-    mock_decode, mock_get_header, mock_get_env, mock_requests_get
+    mock_decode, mock_get_header, mock_get_env, mock_requests_get, make_resp
 ):
-    mock_get_env.side_effect = lambda key, default=None: (
-        "issuer"
-        if key == "OAUTH_ISSUER_BASE_URL"
-        else "aud" if key == "OAUTH_AUDIENCE" else "table"
-    )
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "kid1"}]}),
-    )
+    mock_get_env.side_effect = _JWT_ENV.get
+    mock_requests_get.return_value = make_resp(200, {"keys": [{"kid": "kid1"}]})
     mock_get_header.return_value = {"kid": "kid1"}
     mock_decode.side_effect = ExpiredSignatureError("JWT token has expired")
     with pytest.raises(ClaimException, match="JWT token has expired"):
@@ -1661,21 +1794,14 @@ def test_get_claims_jwt_expired_sigs_error(
 
 
 @patch("pycommon.authz.requests.get")
-@patch("pycommon.authz.os.environ.get")
+@patch("os.environ.get")
 @patch("pycommon.authz.jwt.get_unverified_header")
 @patch("pycommon.authz.jwt.decode")
 def test_get_claims_jwt_expired_claims_error(
-    mock_decode, mock_get_header, mock_get_env, mock_requests_get
+    mock_decode, mock_get_header, mock_get_env, mock_requests_get, make_resp
 ):
-    mock_get_env.side_effect = lambda key, default=None: (
-        "issuer"
-        if key == "OAUTH_ISSUER_BASE_URL"
-        else "aud" if key == "OAUTH_AUDIENCE" else "table"
-    )
-    mock_requests_get.return_value = MagicMock(
-        ok=True,
-        json=MagicMock(return_value={"keys": [{"kid": "kid1"}]}),
-    )
+    mock_get_env.side_effect = _JWT_ENV.get
+    mock_requests_get.return_value = make_resp(200, {"keys": [{"kid": "kid1"}]})
     mock_get_header.return_value = {"kid": "kid1"}
     mock_decode.side_effect = JWTClaimsError("Invalid JWT Claims")
     with pytest.raises(ClaimException, match="Invalid JWT claims"):
@@ -1751,8 +1877,7 @@ def test_add_api_access_types():
         pycommon.authz._access_types = original_access_types
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_empty_access_types(mock_getenv, mock_boto3):
     """Test api_claims when _access_types is empty - should raise PermissionError."""
     import pycommon.authz
@@ -1764,9 +1889,7 @@ def test_api_claims_empty_access_types(mock_getenv, mock_boto3):
         # Set _access_types to empty list
         pycommon.authz._access_types = []
 
-        mock_getenv.side_effect = lambda key: {
-            "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-        }.get(key)
+        mock_getenv.side_effect = _API_KEYS_ENV.get
 
         mock_table = MagicMock()
         mock_table.query.return_value = {
@@ -1795,8 +1918,7 @@ def test_api_claims_empty_access_types(mock_getenv, mock_boto3):
         pycommon.authz._access_types = original_access_types
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_partial_access_match(mock_getenv, mock_boto3):
     """Test api_claims when API key has some matching access types."""
     import pycommon.authz
@@ -1808,10 +1930,7 @@ def test_api_claims_partial_access_match(mock_getenv, mock_boto3):
         # Set specific access types required
         pycommon.authz._access_types = ["chat", "assistants"]
 
-        mock_getenv.side_effect = lambda key: {
-            "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-            "COST_CALCULATIONS_DYNAMO_TABLE": "mock_cost_calculations_table",
-        }.get(key)
+        mock_getenv.side_effect = _API_COSTS_ENV.get
 
         mock_api_keys_table = MagicMock()
         mock_api_keys_table.query.return_value = {
@@ -1859,8 +1978,7 @@ def test_api_claims_partial_access_match(mock_getenv, mock_boto3):
         pycommon.authz._access_types = original_access_types
 
 
-@patch("pycommon.authz.boto3.resource")
-@patch("pycommon.authz.os.getenv")
+@patch("os.getenv")
 def test_api_claims_no_matching_access_types(mock_getenv, mock_boto3):
     """Test api_claims when API key has no matching access types."""
     import pycommon.authz
@@ -1872,9 +1990,7 @@ def test_api_claims_no_matching_access_types(mock_getenv, mock_boto3):
         # Set specific access types required
         pycommon.authz._access_types = ["assistants", "dual_embedding"]
 
-        mock_getenv.side_effect = lambda key: {
-            "API_KEYS_DYNAMODB_TABLE": "mock_api_keys_table",
-        }.get(key)
+        mock_getenv.side_effect = _API_KEYS_ENV.get
 
         mock_table = MagicMock()
         mock_table.query.return_value = {